@@ -1,9 +1,9 @@
 """Caller ID and phone number lookup endpoints"""
 from typing import List, Optional
-from datetime import datetime
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from pydantic import BaseModel, Field
 
+from app.core.clock import utc_now
 from app.core.security import get_current_user_id
 from app.core.database import get_database
 from app.services.caller_service import CallerService
@@ -37,7 +37,7 @@ class PhoneLookupResponse(BaseModel):
 
 class BulkLookupRequest(BaseModel):
     """Request model for bulk phone number lookup"""
-    phone_numbers: List[str] = Field(..., max_items=30, description="List of phone numbers (max 30)")
+    phone_numbers: List[str] = Field(..., max_length=30, description="List of phone numbers (max 30)")
     country_code: str = Field(default="TR", description="Country code")
 
 
@@ -173,7 +173,7 @@ async def report_spam(
             reason=report.reason,
             caller_name=report.caller_name,
             reported_by=user_id,
-            created_at=datetime.utcnow(),
+            created_at=utc_now(),
         )
     except HTTPException:
         raise
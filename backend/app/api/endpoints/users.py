@@ -1,10 +1,11 @@
 """User profile and settings endpoints"""
 from typing import Optional
-from fastapi import APIRouter, HTTPException, status, Depends, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Body, Query
 from pydantic import BaseModel, Field
+from bson import ObjectId
 
 from app.core.database import get_database
-from app.core.security import get_current_user_id
+from app.core.security import get_current_user_id, get_current_user_oid
 from app.models.user import UserResponse
 from app.models.settings import UserSettings, SettingsUpdate, WhitelistAdd, BlacklistAdd
 from app.services.user_service import UserService
@@ -27,12 +28,12 @@ class PasswordChange(BaseModel):
 
 @router.get("/me", response_model=UserResponse)
 async def get_profile(
-    user_id: str = Depends(get_current_user_id),
+    user_oid: ObjectId = Depends(get_current_user_oid),
     db=Depends(get_database),
 ):
     """Get current user's profile"""
     user_service = UserService(db)
-    profile = await user_service.get_profile(user_id)
+    profile = await user_service.get_profile(user_oid)
 
     if not profile:
         raise HTTPException(
@@ -46,13 +47,13 @@ async def get_profile(
 @router.patch("/me", response_model=UserResponse)
 async def update_profile(
     update_data: ProfileUpdate,
-    user_id: str = Depends(get_current_user_id),
+    user_oid: ObjectId = Depends(get_current_user_oid),
     db=Depends(get_database),
 ):
     """Update current user's profile"""
     user_service = UserService(db)
     profile = await user_service.update_profile(
-        user_id,
+        user_oid,
         full_name=update_data.full_name,
         phone=update_data.phone,
         language=update_data.language,
@@ -70,14 +71,14 @@ async def update_profile(
 @router.post("/me/change-password")
 async def change_password(
     password_data: PasswordChange,
-    user_id: str = Depends(get_current_user_id),
+    user_oid: ObjectId = Depends(get_current_user_oid),
     db=Depends(get_database),
 ):
     """Change user's password"""
     user_service = UserService(db)
     try:
         await user_service.change_password(
-            user_id,
+            user_oid,
             password_data.current_password,
             password_data.new_password,
         )
@@ -91,12 +92,12 @@ async def change_password(
 
 @router.delete("/me")
 async def delete_account(
-    user_id: str = Depends(get_current_user_id),
+    user_oid: ObjectId = Depends(get_current_user_oid),
     db=Depends(get_database),
 ):
     """Delete user account and all associated data"""
     user_service = UserService(db)
-    success = await user_service.delete_account(user_id)
+    success = await user_service.delete_account(user_oid)
 
     if not success:
         raise HTTPException(
@@ -110,12 +111,27 @@ async def delete_account(
 # Settings endpoints
 @router.get("/me/settings", response_model=UserSettings)
 async def get_settings(
+    whitelist_skip: int = Query(0, ge=0),
+    whitelist_limit: Optional[int] = Query(None, ge=1, le=500),
+    blacklist_skip: int = Query(0, ge=0),
+    blacklist_limit: Optional[int] = Query(None, ge=1, le=500),
     user_id: str = Depends(get_current_user_id),
     db=Depends(get_database),
 ):
-    """Get user's settings"""
+    """
+    Get user's settings.
+
+    Whitelist and blacklist are returned in full unless a skip/limit is
+    given; `whitelist_total` and `blacklist_total` hold the full entry counts.
+    """
     user_service = UserService(db)
-    settings = await user_service.get_settings(user_id)
+    settings = await user_service.get_settings(
+        user_id,
+        wl_skip=whitelist_skip,
+        wl_limit=whitelist_limit,
+        bl_skip=blacklist_skip,
+        bl_limit=blacklist_limit,
+    )
 
     if not settings:
         raise HTTPException(
@@ -154,9 +170,15 @@ async def add_whitelist(
 ):
     """Add sender/keyword to whitelist"""
     user_service = UserService(db)
-    success = await user_service.add_to_whitelist(
-        user_id, entry.value, entry.type, entry.note
-    )
+    try:
+        success = await user_service.add_to_whitelist(
+            user_id, entry.value, entry.type, entry.note
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
 
     if not success:
         raise HTTPException(
@@ -195,9 +217,15 @@ async def add_blacklist(
 ):
     """Add sender/keyword to blacklist"""
     user_service = UserService(db)
-    success = await user_service.add_to_blacklist(
-        user_id, entry.value, entry.type, entry.reason
-    )
+    try:
+        success = await user_service.add_to_blacklist(
+            user_id, entry.value, entry.type, entry.reason
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
 
     if not success:
         raise HTTPException(
@@ -0,0 +1,13 @@
+"""Time helpers shared across services"""
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """
+    Current UTC time as a naive datetime
+
+    Stored timestamps are naive UTC, matching what datetime.utcnow() used to
+    store and what Motor returns, so the tzinfo is dropped to keep comparisons
+    consistent.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,5 +1,5 @@
 """Application configuration settings for Nexura-cAIL"""
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 from typing import List
 import os
@@ -34,6 +34,10 @@ class Settings(BaseSettings):
     # Emergent LLM Key (Universal)
     EMERGENT_LLM_KEY: str = ""
 
+    # OpenAI (fallback spam detector)
+    OPENAI_API_KEY: str = ""
+    OPENAI_MODEL: str = "gpt-4o-mini"
+
     # Stripe Payment
     STRIPE_API_KEY: str = ""
 
@@ -45,6 +49,10 @@ class Settings(BaseSettings):
     PREMIUM_TIER_DAILY_LIMIT: int = 1000
     PRO_TIER_DAILY_LIMIT: int = 10000
 
+    # Spam Detection
+    # Local pattern matches at or above this confidence skip the AI call
+    LOCAL_MATCH_CONFIDENCE_THRESHOLD: float = 0.7
+
     @field_validator("SECRET_KEY")
     @classmethod
     def validate_secret_key(cls, v: str) -> str:
@@ -87,9 +95,7 @@ class Settings(BaseSettings):
             for issue in issues:
                 logger.warning(issue)
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
 # Initialize settings
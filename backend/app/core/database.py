@@ -62,10 +62,31 @@ class Database:
             )
             await self.db.community_spam.create_index("last_reported", name="community_spam_last_reported")
 
+            # Daily usage counters expire two days after the day they count
+            await self.db.daily_usage.create_index(
+                "day",
+                expireAfterSeconds=2 * 24 * 60 * 60,
+                name="daily_usage_day_ttl"
+            )
+
             logger.info("✅ Database indexes created successfully")
         except Exception as e:
             logger.warning(f"⚠️  Failed to create some indexes: {e}")
 
+        # Built last and on its own: databases created before subscriptions were
+        # upserted may hold duplicate user_id rows, which fail a unique build
+        try:
+            await self.db.subscriptions.create_index(
+                "user_id",
+                unique=True,
+                name="subscriptions_user_unique"
+            )
+        except Exception as e:
+            logger.warning(
+                f"⚠️  Failed to create subscriptions_user_unique "
+                f"(remove duplicate subscriptions per user_id): {e}"
+            )
+
     async def connect(self) -> None:
         """Establish database connection and create indexes"""
         try:
@@ -1,6 +1,8 @@
 """Security utilities for authentication"""
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
+from bson import ObjectId
+from bson.errors import InvalidId
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -99,6 +101,20 @@ async def get_current_user_id(
     return user_id
 
 
+async def get_current_user_oid(
+    user_id: str = Depends(get_current_user_id)
+) -> ObjectId:
+    """Extract user ID from JWT token as an ObjectId, converted once per request"""
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
@@ -125,8 +141,13 @@ async def get_current_user(
     if token_type != "access":
         raise credentials_exception
 
+    try:
+        user_oid = ObjectId(user_id)
+    except (InvalidId, TypeError):
+        raise credentials_exception
+
     # Get user from database
-    user = await database.db["users"].find_one({"_id": user_id})
+    user = await database.db["users"].find_one({"_id": user_oid})
     if not user:
         raise credentials_exception
     
@@ -134,5 +155,7 @@ async def get_current_user(
         "id": str(user["_id"]),
         "email": user["email"],
         "full_name": user["full_name"],
-        "language": user.get("language", "en")
+        "language": user.get("language", "en"),
+        "tier": user.get("tier"),
+        "subscription_status": user.get("subscription_status"),
     }
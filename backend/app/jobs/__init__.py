@@ -0,0 +1 @@
+"""Offline jobs run outside the API process"""
@@ -0,0 +1,29 @@
+"""
+Nightly job recomputing community spam scores
+
+Run from the backend directory, e.g. from cron:
+    python -m app.jobs.rescore_community_spam
+"""
+import asyncio
+import logging
+
+from app.core.database import database
+from app.services.spam_report_service import SpamReportService
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> int:
+    """Rescore every community spam record, returns the number of changed scores"""
+    await database.connect()
+    try:
+        updated = await SpamReportService(database.db).rescore_community_spam()
+        logger.info(f"Rescored community spam, {updated} scores changed")
+        return updated
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
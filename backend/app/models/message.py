@@ -1,5 +1,5 @@
 """Message and spam analysis models"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -21,6 +21,9 @@ class SpamCategory(str, Enum):
 
 class SpamAnalysis(BaseModel):
     """AI analysis result for a message"""
+    # Frozen because local results are cached and shared between requests
+    model_config = ConfigDict(frozen=True)
+
     is_spam: bool
     confidence: float = Field(..., ge=0.0, le=1.0)
     category: SpamCategory
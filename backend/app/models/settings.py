@@ -1,27 +1,36 @@
 """User settings and whitelist/blacklist models"""
-from pydantic import BaseModel, Field
+import re
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import List, Optional
 from datetime import datetime
 
+from app.core.clock import utc_now
+
+# Phone prefix entries: digits with an optional leading "+" and a trailing "*"
+PHONE_PREFIX_PATTERN = re.compile(r"\+?[0-9]+\*")
+
 
 class WhitelistEntry(BaseModel):
     """Whitelisted sender entry"""
     value: str  # Phone number or keyword
     type: str = Field(..., pattern=r"^(phone|keyword|sender)$")
     note: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 
 class BlacklistEntry(BaseModel):
     """Blacklisted sender entry"""
-    value: str  # Phone number or keyword
-    type: str = Field(..., pattern=r"^(phone|keyword|sender)$")
+    value: str  # Phone number, phone prefix ("+9012*") or keyword
+    type: str = Field(..., pattern=r"^(phone|phone_prefix|keyword|sender)$")
     reason: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 
 class UserSettings(BaseModel):
     """User settings model"""
+    model_config = ConfigDict(frozen=True)
+
     user_id: str
     auto_block_spam: bool = True
     auto_block_threshold: float = Field(default=0.8, ge=0.0, le=1.0)
@@ -29,11 +38,13 @@ class UserSettings(BaseModel):
     language: str = Field(default="tr", pattern=r"^(tr|en)$")
     whitelist: List[WhitelistEntry] = []
     blacklist: List[BlacklistEntry] = []
+    whitelist_total: int = 0  # Total entries, whitelist holds one page
+    blacklist_total: int = 0  # Total entries, blacklist holds one page
     block_categories: List[str] = [
         "betting", "phishing", "scam", "malware", "fraud"
     ]
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 
 class SettingsUpdate(BaseModel):
@@ -55,5 +66,12 @@ class WhitelistAdd(BaseModel):
 class BlacklistAdd(BaseModel):
     """Request model for adding to blacklist"""
     value: str = Field(..., min_length=1, max_length=100)
-    type: str = Field(..., pattern=r"^(phone|keyword|sender)$")
+    type: str = Field(..., pattern=r"^(phone|phone_prefix|keyword|sender)$")
     reason: Optional[str] = Field(None, max_length=200)
+
+    @model_validator(mode="after")
+    def validate_phone_prefix(self) -> "BlacklistAdd":
+        """Validate phone_prefix values such as +9012*"""
+        if self.type == "phone_prefix" and not PHONE_PREFIX_PATTERN.fullmatch(self.value):
+            raise ValueError('phone_prefix must be digits with an optional leading "+" and a trailing "*"')
+        return self
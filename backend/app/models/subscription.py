@@ -1,5 +1,5 @@
 """Subscription models for premium features"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -48,6 +48,8 @@ class UserSubscription(BaseModel):
 
 class SubscriptionResponse(BaseModel):
     """Response model for subscription data"""
+    model_config = ConfigDict(frozen=True)
+
     tier: SubscriptionTier
     status: SubscriptionStatus
     start_date: datetime
@@ -1,5 +1,5 @@
 """User models for authentication"""
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
@@ -21,6 +21,8 @@ class UserLogin(BaseModel):
 
 class UserResponse(BaseModel):
     """Response model for user data"""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     email: str
     full_name: str
@@ -46,6 +48,8 @@ class UserInDB(BaseModel):
     updated_at: datetime
     total_messages_analyzed: int = 0
     total_spam_blocked: int = 0
+    tier: str = "free"  # Mirrors subscriptions.tier
+    subscription_status: str = "active"  # Mirrors subscriptions.status
 
 
 class TokenResponse(BaseModel):
@@ -1,8 +1,9 @@
 """Authentication service"""
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional, Tuple
 from bson import ObjectId
 
+from app.core.clock import utc_now
 from app.core.security import (
     verify_password,
     get_password_hash,
@@ -12,6 +13,7 @@ from app.core.security import (
 )
 from app.core.config import settings
 from app.models.user import UserCreate, UserInDB, UserResponse
+from app.models.subscription import SubscriptionTier, SubscriptionStatus
 
 
 class AuthService:
@@ -32,7 +34,7 @@ class AuthService:
             raise ValueError("Email already registered")
 
         # Create user document
-        now = datetime.utcnow()
+        now = utc_now()
         user_doc = {
             "email": user_data.email,
             "hashed_password": get_password_hash(user_data.password),
@@ -45,6 +47,8 @@ class AuthService:
             "updated_at": now,
             "total_messages_analyzed": 0,
             "total_spam_blocked": 0,
+            "tier": SubscriptionTier.FREE.value,
+            "subscription_status": SubscriptionStatus.ACTIVE.value,
         }
 
         # Insert user
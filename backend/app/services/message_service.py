@@ -1,8 +1,8 @@
 """Message analysis and storage service"""
-from datetime import datetime
-from typing import List, Optional, Dict
+from typing import FrozenSet, List, Dict, Tuple
 from bson import ObjectId
 
+from app.core.clock import utc_now
 from app.models.message import (
     MessageCreate,
     MessageResponse,
@@ -11,6 +11,7 @@ from app.models.message import (
     SpamCategory,
 )
 from app.services.spam_detector import spam_detector
+from app.services.subscription_service import daily_usage_key, utc_day_start
 
 
 class MessageService:
@@ -21,6 +22,7 @@ class MessageService:
         self.messages = db["messages"]
         self.users = db["users"]
         self.settings = db["settings"]
+        self.daily_usage = db["daily_usage"]
 
     async def analyze_message(
         self,
@@ -30,18 +32,9 @@ class MessageService:
         """
         Analyze a message for spam and store the result
         """
-        # Get user settings for whitelist/blacklist
-        user_settings = await self.settings.find_one({"user_id": user_id})
-        whitelist = []
-        blacklist = []
-        auto_block = True
-        block_threshold = 0.8
-
-        if user_settings:
-            whitelist = [e["value"] for e in user_settings.get("whitelist", [])]
-            blacklist = [e["value"] for e in user_settings.get("blacklist", [])]
-            auto_block = user_settings.get("auto_block_spam", True)
-            block_threshold = user_settings.get("auto_block_threshold", 0.8)
+        (
+            whitelist, blacklist, blacklist_prefixes, auto_block, block_threshold
+        ) = await self._load_filters(user_id)
 
         # Analyze the message
         analysis = await spam_detector.analyze(
@@ -49,60 +42,13 @@ class MessageService:
             sender=message.sender or message.sender_phone,
             whitelist=whitelist,
             blacklist=blacklist,
+            blacklist_prefixes=blacklist_prefixes,
         )
 
-        # Determine if should be blocked
-        should_block = (
-            auto_block and
-            analysis.is_spam and
-            analysis.confidence >= block_threshold
-        )
-
-        # Store the message
-        now = datetime.utcnow()
-        message_doc = {
-            "user_id": user_id,
-            "content": message.content,
-            "sender": message.sender,
-            "sender_phone": message.sender_phone,
-            "source": message.source,
-            "analysis": {
-                "is_spam": analysis.is_spam,
-                "confidence": analysis.confidence,
-                "category": analysis.category.value,
-                "risk_level": analysis.risk_level,
-                "explanation": analysis.explanation,
-                "detected_patterns": analysis.detected_patterns,
-                "recommended_action": analysis.recommended_action,
-            },
-            "is_blocked": should_block,
-            "created_at": now,
-            "user_feedback": None,
-        }
-
-        result = await self.messages.insert_one(message_doc)
-
-        # Update user stats
-        update_fields = {"$inc": {"total_messages_analyzed": 1}}
-        if analysis.is_spam:
-            update_fields["$inc"]["total_spam_blocked"] = 1
-
-        await self.users.update_one(
-            {"_id": ObjectId(user_id)},
-            update_fields,
-        )
-
-        return MessageResponse(
-            id=str(result.inserted_id),
-            content=message.content,
-            sender=message.sender,
-            sender_phone=message.sender_phone,
-            source=message.source,
-            analysis=analysis,
-            is_blocked=should_block,
-            created_at=now,
-            user_feedback=None,
+        results = await self._store_results(
+            user_id, [message], [analysis], auto_block, block_threshold
         )
+        return results[0]
 
     async def analyze_bulk(
         self,
@@ -110,25 +56,138 @@ class MessageService:
         messages: List[MessageCreate],
     ) -> Dict:
         """Analyze multiple messages at once"""
-        results = []
-        spam_count = 0
-        safe_count = 0
-
-        for msg in messages:
-            result = await self.analyze_message(user_id, msg)
-            results.append(result)
-            if result.analysis.is_spam:
-                spam_count += 1
-            else:
-                safe_count += 1
+        (
+            whitelist, blacklist, blacklist_prefixes, auto_block, block_threshold
+        ) = await self._load_filters(user_id)
+
+        # Analyze the whole batch in one detector call
+        analyses = await spam_detector.analyze_batch(
+            [(msg.content, msg.sender or msg.sender_phone) for msg in messages],
+            whitelist=whitelist,
+            blacklist=blacklist,
+            blacklist_prefixes=blacklist_prefixes,
+        )
+
+        results = await self._store_results(
+            user_id, messages, analyses, auto_block, block_threshold
+        )
+        spam_count = sum(1 for result in results if result.analysis.is_spam)
 
         return {
             "total": len(results),
             "spam_count": spam_count,
-            "safe_count": safe_count,
+            "safe_count": len(results) - spam_count,
             "results": results,
         }
 
+    async def _load_filters(
+        self, user_id: str
+    ) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str], bool, float]:
+        """Get user settings for whitelist/blacklist/phone prefixes and auto-blocking"""
+        user_settings = await self.settings.find_one({"user_id": user_id})
+        whitelist = frozenset()
+        blacklist = frozenset()
+        blacklist_prefixes = frozenset()
+        auto_block = True
+        block_threshold = 0.8
+
+        if user_settings:
+            whitelist = frozenset(e["value"] for e in user_settings.get("whitelist", []))
+            entries = user_settings.get("blacklist", [])
+            blacklist = frozenset(
+                e["value"] for e in entries if e.get("type") != "phone_prefix"
+            )
+            blacklist_prefixes = frozenset(
+                e["value"] for e in entries if e.get("type") == "phone_prefix"
+            )
+            auto_block = user_settings.get("auto_block_spam", True)
+            block_threshold = user_settings.get("auto_block_threshold", 0.8)
+
+        return whitelist, blacklist, blacklist_prefixes, auto_block, block_threshold
+
+    async def _store_results(
+        self,
+        user_id: str,
+        messages: List[MessageCreate],
+        analyses: List[SpamAnalysis],
+        auto_block: bool,
+        block_threshold: float,
+    ) -> List[MessageResponse]:
+        """Store analyzed messages and count them towards the user's usage and stats"""
+        now = utc_now()
+        message_docs = []
+        blocked = []
+        for message, analysis in zip(messages, analyses):
+            # Determine if should be blocked
+            should_block = (
+                auto_block and
+                analysis.is_spam and
+                analysis.confidence >= block_threshold
+            )
+            blocked.append(should_block)
+
+            message_docs.append({
+                "user_id": user_id,
+                "content": message.content,
+                "sender": message.sender,
+                "sender_phone": message.sender_phone,
+                "source": message.source,
+                "analysis": {
+                    "is_spam": analysis.is_spam,
+                    "confidence": analysis.confidence,
+                    "category": analysis.category.value,
+                    "risk_level": analysis.risk_level,
+                    "explanation": analysis.explanation,
+                    "detected_patterns": analysis.detected_patterns,
+                    "recommended_action": analysis.recommended_action,
+                },
+                "is_blocked": should_block,
+                "created_at": now,
+                "user_feedback": None,
+            })
+
+        # Store all messages in a single round-trip
+        result = await self.messages.insert_many(message_docs, ordered=False)
+
+        # Count towards today's usage
+        today_start = utc_day_start(now)
+        await self.daily_usage.update_one(
+            {"_id": daily_usage_key(user_id, today_start)},
+            {
+                "$inc": {"count": len(message_docs)},
+                "$setOnInsert": {"user_id": user_id, "day": today_start},
+            },
+            upsert=True,
+        )
+
+        # Update user stats
+        spam_count = sum(1 for analysis in analyses if analysis.is_spam)
+        update_fields = {"$inc": {"total_messages_analyzed": len(message_docs)}}
+        if spam_count:
+            update_fields["$inc"]["total_spam_blocked"] = spam_count
+
+        await self.users.update_one(
+            {"_id": ObjectId(user_id)},
+            update_fields,
+        )
+
+        return [
+            MessageResponse(
+                id=str(inserted_id),
+                content=message.content,
+                sender=message.sender,
+                sender_phone=message.sender_phone,
+                source=message.source,
+                analysis=analysis,
+                is_blocked=should_block,
+                created_at=now,
+                user_feedback=None,
+            )
+            for message, analysis, should_block, inserted_id in zip(
+                messages, analyses, blocked, result.inserted_ids
+            )
+        ]
+
     async def get_user_messages(
         self,
         user_id: str,
@@ -185,62 +244,55 @@ class MessageService:
 
     async def get_stats(self, user_id: str) -> MessageStats:
         """Get user's message statistics"""
+        # Totals, categories and feedback in a single pass over the user's messages
         pipeline = [
             {"$match": {"user_id": user_id}},
             {
-                "$group": {
-                    "_id": None,
-                    "total_analyzed": {"$sum": 1},
-                    "total_spam": {
-                        "$sum": {"$cond": ["$analysis.is_spam", 1, 0]}
-                    },
-                    "total_safe": {
-                        "$sum": {"$cond": ["$analysis.is_spam", 0, 1]}
-                    },
-                    "blocked_count": {
-                        "$sum": {"$cond": ["$is_blocked", 1, 0]}
-                    },
+                "$facet": {
+                    "totals": [
+                        {
+                            "$group": {
+                                "_id": None,
+                                "total_analyzed": {"$sum": 1},
+                                "total_spam": {
+                                    "$sum": {"$cond": ["$analysis.is_spam", 1, 0]}
+                                },
+                                "blocked_count": {
+                                    "$sum": {"$cond": ["$is_blocked", 1, 0]}
+                                },
+                            }
+                        },
+                    ],
+                    "by_category": [
+                        {"$match": {"analysis.is_spam": True}},
+                        {"$group": {"_id": "$analysis.category", "count": {"$sum": 1}}},
+                    ],
+                    "feedback": [
+                        {"$match": {"user_feedback": {"$ne": None}}},
+                        {"$group": {"_id": "$user_feedback", "count": {"$sum": 1}}},
+                    ],
                 }
             },
         ]
 
         result = await self.messages.aggregate(pipeline).to_list(1)
-
-        if not result:
-            return MessageStats(
-                total_analyzed=0,
-                total_spam=0,
-                total_safe=0,
-                spam_by_category={},
-                blocked_count=0,
-                accuracy_feedback={},
-            )
-
-        stats = result[0]
-
-        # Get spam by category
-        category_pipeline = [
-            {"$match": {"user_id": user_id, "analysis.is_spam": True}},
-            {"$group": {"_id": "$analysis.category", "count": {"$sum": 1}}},
+        facets = result[0] if result else {}
+        totals = facets.get("totals") or [
+            {"total_analyzed": 0, "total_spam": 0, "blocked_count": 0}
         ]
-        category_result = await self.messages.aggregate(category_pipeline).to_list(20)
-        spam_by_category = {item["_id"]: item["count"] for item in category_result}
-
-        # Get feedback stats
-        feedback_pipeline = [
-            {"$match": {"user_id": user_id, "user_feedback": {"$ne": None}}},
-            {"$group": {"_id": "$user_feedback", "count": {"$sum": 1}}},
-        ]
-        feedback_result = await self.messages.aggregate(feedback_pipeline).to_list(10)
-        accuracy_feedback = {item["_id"]: item["count"] for item in feedback_result}
+        stats = totals[0]
 
         return MessageStats(
             total_analyzed=stats["total_analyzed"],
             total_spam=stats["total_spam"],
-            total_safe=stats["total_safe"],
-            spam_by_category=spam_by_category,
+            total_safe=stats["total_analyzed"] - stats["total_spam"],
+            spam_by_category={
+                item["_id"]: item["count"] for item in facets.get("by_category", [])
+            },
             blocked_count=stats["blocked_count"],
-            accuracy_feedback=accuracy_feedback,
+            accuracy_feedback={
+                item["_id"]: item["count"] for item in facets.get("feedback", [])
+            },
         )
 
     async def delete_message(self, user_id: str, message_id: str) -> bool:
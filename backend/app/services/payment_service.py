@@ -1,13 +1,14 @@
 """Payment service for Stripe integration"""
 import logging
 from typing import Optional
-from datetime import datetime
 from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
 
+from app.core.clock import utc_now
 from app.core.config import settings
 from app.core.database import database
 from app.models.payment import PaymentTransaction, PaymentStatus
 from app.models.subscription import SubscriptionTier, SUBSCRIPTION_PLANS
+from app.services.subscription_service import sync_user_subscription
 
 logger = logging.getLogger(__name__)
 
@@ -141,8 +142,8 @@ class PaymentService:
             "payment_status": PaymentStatus.INITIATED.value,
             "status": "initiated",
             "metadata": metadata,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": utc_now(),
+            "updated_at": utc_now()
         }
         
         await database.db["payment_transactions"].insert_one(transaction)
@@ -209,7 +210,7 @@ class PaymentService:
                 "$set": {
                     "payment_status": payment_status.value,
                     "status": status.status,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": utc_now()
                 }
             }
         )
@@ -229,7 +230,7 @@ class PaymentService:
 
         # Calculate end date based on billing cycle
         from datetime import timedelta
-        start_date = datetime.utcnow()
+        start_date = utc_now()
         if billing_cycle == "monthly":
             end_date = start_date + timedelta(days=30)
         else:  # yearly
@@ -245,12 +246,13 @@ class PaymentService:
                     "start_date": start_date,
                     "end_date": end_date,
                     "auto_renew": True,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": utc_now()
                 }
             },
             upsert=True
         )
 
+        await sync_user_subscription(user_id, tier, "active")
         logger.info(f"User {user_id} upgraded to {tier} subscription")
 
     async def handle_webhook(self, webhook_body: bytes, signature: str, webhook_url: str):
@@ -0,0 +1,75 @@
+"""Digit trie for phone number prefix blocking"""
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional
+
+# Separators people type inside phone numbers
+PHONE_SEPARATORS = re.compile(r"[\s\-().]")
+
+# A phone number after separators are removed: optional "+" then digits
+PHONE_NUMBER = re.compile(r"\+?[0-9]+")
+
+# Node key marking the end of an inserted prefix
+_END = ""
+
+
+def normalize_phone(value: str) -> Optional[str]:
+    """
+    Reduce a phone number or prefix to its digits
+
+    Args:
+        value: Phone number such as "+90 (123) 456-78-90", or prefix such as "+9012*"
+
+    Returns:
+        Digits only, or None if the value is not a phone number
+    """
+    value = PHONE_SEPARATORS.sub("", value).rstrip("*")
+    if not PHONE_NUMBER.fullmatch(value):
+        return None
+    return value.lstrip("+")
+
+
+class PhoneTrie:
+    """Prefix trie over phone number digits, one dict per node"""
+
+    def __init__(self):
+        self._root: Dict[str, dict] = {}
+
+    def insert(self, prefix: str) -> None:
+        """Add a blocked prefix, ignoring values that are not phone numbers"""
+        digits = normalize_phone(prefix)
+        if not digits:
+            return
+        node = self._root
+        for digit in digits:
+            node = node.setdefault(digit, {})
+        node[_END] = prefix
+
+    def find(self, number: str) -> Optional[str]:
+        """Return the shortest inserted prefix the number starts with, or None"""
+        digits = normalize_phone(number)
+        if not digits:
+            return None
+        node = self._root
+        for digit in digits:
+            node = node.get(digit)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+    def matches(self, number: str) -> bool:
+        """True if the number starts with any inserted prefix"""
+        return self.find(number) is not None
+
+
+@lru_cache(maxsize=1024)
+def build_phone_trie(prefixes: FrozenSet[str]) -> Optional[PhoneTrie]:
+    """Build a trie over blacklisted phone prefixes, None if there are none"""
+    if not prefixes:
+        return None
+    trie = PhoneTrie()
+    for prefix in prefixes:
+        trie.insert(prefix)
+    return trie
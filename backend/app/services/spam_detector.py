@@ -1,62 +1,58 @@
 """AI-powered spam detection service using OpenAI GPT-4o-mini"""
-import json
+import asyncio
 import re
-from typing import Optional, List
+from typing import Collection, Optional, List, Tuple
 import logging
+import jiter
 from openai import AsyncOpenAI
 
 from app.core.config import settings
 from app.models.message import SpamAnalysis, SpamCategory
+from app.services.phone_trie import PhoneTrie, build_phone_trie
+from app.services.spam_patterns import (
+    LOCAL_CHECK_THREAD_THRESHOLD,
+    compile_entry_list,
+    local_pattern_check,
+    local_pattern_check_async,
+)
 
 logger = logging.getLogger(__name__)
 
 
-# Turkish spam patterns for local detection
-TURKISH_SPAM_PATTERNS = {
-    "betting": [
-        r"bahis", r"iddaa", r"casino", r"slot", r"rulet",
-        r"canlı\s*bahis", r"yüksek\s*oran", r"bedava\s*bonus",
-        r"free\s*bet", r"kumar", r"jackpot", r"spin",
-    ],
-    "phishing": [
-        r"şifre.*güncelle", r"hesab.*doğrula", r"acil.*giriş",
-        r"banka.*bilgi", r"kredi\s*kart", r"cvv", r"3d\s*secure",
-        r"tıkla.*kazan", r"link.*tıkla",
-    ],
-    "scam": [
-        r"para\s*kazan", r"hemen\s*kazan", r"garantili\s*gelir",
-        r"yatırım.*getiri", r"kripto.*fırsat", r"bitcoin.*kazan",
-        r"zengin\s*ol", r"pasif\s*gelir",
-    ],
-    "lottery": [
-        r"çekiliş.*kazan", r"piyango", r"şanslı\s*numara",
-        r"ödül.*kazan", r"hediye.*kazan", r"milyon.*kazan",
-    ],
-    "promotional": [
-        r"kampanya", r"indirim", r"%\d+\s*off", r"fırsat",
-        r"son\s*gün", r"acele\s*et", r"kaçırma",
-    ],
-}
+# Fields the caller needs before an AI verdict can be returned early
+AI_VERDICT_FIELDS = ("is_spam", "confidence", "category")
 
-# English spam patterns
-ENGLISH_SPAM_PATTERNS = {
-    "betting": [
-        r"betting", r"casino", r"poker", r"slots", r"gambling",
-        r"free\s*spins", r"bonus\s*code", r"jackpot",
-    ],
-    "phishing": [
-        r"verify\s*account", r"update\s*password", r"confirm\s*identity",
-        r"suspended\s*account", r"click\s*here\s*now", r"urgent\s*action",
-    ],
-    "scam": [
-        r"make\s*money", r"earn\s*from\s*home", r"guaranteed\s*income",
-        r"crypto\s*opportunity", r"investment\s*return", r"get\s*rich",
-    ],
-    "lottery": [
-        r"you\s*won", r"prize\s*winner", r"lottery\s*winner",
-        r"claim\s*your\s*prize", r"lucky\s*number",
-    ],
-}
+
+def _parse_settled_verdict(buffer: str) -> Optional[dict]:
+    """
+    Parse a partially streamed JSON object
+    Returns the parsed fields once all verdict fields are final, None otherwise
+    """
+    try:
+        partial = jiter.from_json(buffer.encode(), partial_mode=True)
+    except ValueError:
+        return None
+
+    if not isinstance(partial, dict) or not all(k in partial for k in AI_VERDICT_FIELDS):
+        return None
+
+    # A value is only final once a later field has started (numbers may still be growing)
+    keys = list(partial)
+    if max(keys.index(k) for k in AI_VERDICT_FIELDS) == len(keys) - 1:
+        return None
+
+    return partial
+
+
+def _compile_sender_lists(
+    whitelist: Collection[str],
+    blacklist: Collection[str],
+) -> Tuple[Optional[re.Pattern], Optional[re.Pattern]]:
+    """Compile whitelist and blacklist entries into (whitelist, blacklist) matchers"""
+    return (
+        compile_entry_list(frozenset(e.lower() for e in whitelist)),
+        compile_entry_list(frozenset(e.lower() for e in blacklist)),
+    )
 
 
 class SpamDetector:
@@ -73,52 +69,14 @@ class SpamDetector:
             from openai import AsyncOpenAI
             self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
-    def _local_pattern_check(self, content: str) -> Optional[SpamAnalysis]:
-        """
-        Quick local pattern matching for obvious spam
-        Returns analysis if spam detected, None otherwise
-        """
-        content_lower = content.lower()
-
-        # Check Turkish patterns
-        for category, patterns in TURKISH_SPAM_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    # Strong match for betting/gambling
-                    if category == "betting":
-                        return SpamAnalysis(
-                            is_spam=True,
-                            confidence=0.95,
-                            category=SpamCategory(category),
-                            risk_level="high",
-                            explanation=f"Yasadışı bahis/kumar içeriği tespit edildi ('{pattern}' kalıbı)",
-                            detected_patterns=[pattern],
-                            recommended_action="block",
-                        )
-
-        # Check English patterns
-        for category, patterns in ENGLISH_SPAM_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    if category in ["betting", "phishing", "scam"]:
-                        return SpamAnalysis(
-                            is_spam=True,
-                            confidence=0.90,
-                            category=SpamCategory(category),
-                            risk_level="high",
-                            explanation=f"Spam pattern detected ('{pattern}')",
-                            detected_patterns=[pattern],
-                            recommended_action="block",
-                        )
-
-        return None
-
     async def analyze(
         self,
         content: str,
         sender: Optional[str] = None,
-        whitelist: List[str] = None,
-        blacklist: List[str] = None,
+        whitelist: Optional[Collection[str]] = None,
+        blacklist: Optional[Collection[str]] = None,
+        blacklist_prefixes: Optional[Collection[str]] = None,
+        content_key: Optional[bytes] = None,
     ) -> SpamAnalysis:
         """
         Analyze a message for spam using AI
@@ -126,46 +84,132 @@ class SpamDetector:
         Args:
             content: Message text to analyze
             sender: Optional sender info (phone/name)
-            whitelist: List of whitelisted senders/keywords
-            blacklist: List of blacklisted senders/keywords
+            whitelist: Whitelisted senders/keywords
+            blacklist: Blacklisted senders/keywords
+            blacklist_prefixes: Blocked phone number prefixes such as "+9012*"
+            content_key: Precomputed spam_patterns.content_key(content), if available
 
         Returns:
             SpamAnalysis with detection results
         """
-        whitelist = whitelist or []
-        blacklist = blacklist or []
+        blacklist = blacklist or frozenset()
+        sender_verdict = self._check_sender(
+            sender,
+            *_compile_sender_lists(whitelist or frozenset(), blacklist),
+            blacklist,
+            build_phone_trie(frozenset(blacklist_prefixes or ())),
+        )
+        if sender_verdict:
+            return sender_verdict
+
+        # Quick local check first (long content is scanned off the event loop)
+        local_result = await local_pattern_check_async(content, content_key)
+
+        return await self._resolve(content, sender, local_result)
+
+    async def analyze_batch(
+        self,
+        messages: List[Tuple[str, Optional[str]]],
+        whitelist: Optional[Collection[str]] = None,
+        blacklist: Optional[Collection[str]] = None,
+        blacklist_prefixes: Optional[Collection[str]] = None,
+    ) -> List[SpamAnalysis]:
+        """
+        Analyze several messages sharing the same whitelist/blacklist
+
+        Args:
+            messages: (content, sender) pairs
+            whitelist: Whitelisted senders/keywords
+            blacklist: Blacklisted senders/keywords
+            blacklist_prefixes: Blocked phone number prefixes such as "+9012*"
+
+        Returns:
+            SpamAnalysis per message, in input order
+        """
+        blacklist = blacklist or frozenset()
+
+        # Compile the sender lists once for the whole batch
+        whitelist_rx, blacklist_rx = _compile_sender_lists(whitelist or frozenset(), blacklist)
+        prefix_trie = build_phone_trie(frozenset(blacklist_prefixes or ()))
+        results: List[Optional[SpamAnalysis]] = [
+            self._check_sender(sender, whitelist_rx, blacklist_rx, blacklist, prefix_trie)
+            for _, sender in messages
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        # One pattern pass over the whole batch (off the event loop when large)
+        contents = [messages[i][0] for i in pending]
+        if sum(map(len, contents)) > LOCAL_CHECK_THREAD_THRESHOLD:
+            local_results = await asyncio.to_thread(list, map(local_pattern_check, contents))
+        else:
+            local_results = [local_pattern_check(content) for content in contents]
+
+        resolved = await asyncio.gather(*(
+            self._resolve(messages[i][0], messages[i][1], local_result)
+            for i, local_result in zip(pending, local_results)
+        ))
+        for i, result in zip(pending, resolved):
+            results[i] = result
+
+        return results
+
+    def _check_sender(
+        self,
+        sender: Optional[str],
+        whitelist_rx: Optional[re.Pattern],
+        blacklist_rx: Optional[re.Pattern],
+        blacklist: Collection[str],
+        prefix_trie: Optional[PhoneTrie] = None,
+    ) -> Optional[SpamAnalysis]:
+        """
+        Return a verdict if the sender is whitelisted or blacklisted, None otherwise
+        Entries match anywhere in the sender, case-insensitively; phone prefixes
+        match the start of the sender's number
+        """
+        if not sender:
+            return None
+
+        sender_lower = sender.lower()
 
         # Check whitelist first
-        if sender:
-            for entry in whitelist:
-                if entry.lower() in sender.lower():
-                    return SpamAnalysis(
-                        is_spam=False,
-                        confidence=1.0,
-                        category=SpamCategory.SAFE,
-                        risk_level="low",
-                        explanation="Gönderen güvenilir listesinde / Sender is whitelisted",
-                        detected_patterns=[],
-                        recommended_action="allow",
-                    )
-
-        # Check blacklist
-        if sender:
-            for entry in blacklist:
-                if entry.lower() in sender.lower():
-                    return SpamAnalysis(
-                        is_spam=True,
-                        confidence=1.0,
-                        category=SpamCategory.OTHER,
-                        risk_level="high",
-                        explanation="Gönderen kara listede / Sender is blacklisted",
-                        detected_patterns=[entry],
-                        recommended_action="block",
-                    )
-
-        # Quick local check first
-        local_result = self._local_pattern_check(content)
-        if local_result and local_result.confidence >= 0.9:
+        if whitelist_rx and whitelist_rx.search(sender_lower):
+            return SpamAnalysis(
+                is_spam=False,
+                confidence=1.0,
+                category=SpamCategory.SAFE,
+                risk_level="low",
+                explanation="Gönderen güvenilir listesinde / Sender is whitelisted",
+                detected_patterns=[],
+                recommended_action="allow",
+            )
+
+        # Check blacklist, then blocked phone prefixes
+        match = blacklist_rx.search(sender_lower) if blacklist_rx else None
+        if match:
+            entry = next(e for e in blacklist if e.lower() == match.group())
+        else:
+            entry = prefix_trie.find(sender) if prefix_trie else None
+        if entry:
+            return SpamAnalysis(
+                is_spam=True,
+                confidence=1.0,
+                category=SpamCategory.OTHER,
+                risk_level="high",
+                explanation="Gönderen kara listede / Sender is blacklisted",
+                detected_patterns=[entry],
+                recommended_action="block",
+            )
+
+        return None
+
+    async def _resolve(
+        self,
+        content: str,
+        sender: Optional[str],
+        local_result: Optional[SpamAnalysis],
+    ) -> SpamAnalysis:
+        """Return the local verdict if confident enough, otherwise ask the AI"""
+        if local_result and local_result.confidence >= settings.LOCAL_MATCH_CONFIDENCE_THRESHOLD:
             return local_result
 
         # Use AI for deeper analysis
@@ -219,7 +263,7 @@ Be strict about betting/gambling content - it's illegal in Turkey and very commo
         if sender:
             user_message += f"\n\nSender: {sender}"
 
-        response = await self.client.chat.completions.create(
+        stream = await self.client.chat.completions.create(
             model=settings.OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -228,18 +272,46 @@ Be strict about betting/gambling content - it's illegal in Turkey and very commo
             temperature=0.1,
             max_tokens=500,
             response_format={"type": "json_object"},
+            stream=True,
         )
 
-        result = json.loads(response.choices[0].message.content)
+        # Parse the JSON while it streams and stop once the verdict fields are final
+        buffer = ""
+        result = None
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                buffer += delta
+                # Only re-parse when a field boundary may have been crossed
+                if "," in delta or "}" in delta:
+                    result = _parse_settled_verdict(buffer)
+                    if result is not None:
+                        break
+        finally:
+            await stream.close()
+
+        if result is None:
+            result = jiter.from_json(buffer.encode())
+
+        is_spam = result.get("is_spam", False)
+        confidence = min(max(result.get("confidence", 0.5), 0.0), 1.0)
+        if is_spam and confidence >= 0.9:
+            default_risk, default_action = "high", "block"
+        elif is_spam:
+            default_risk, default_action = "medium", "warn"
+        else:
+            default_risk, default_action = "low", "allow"
 
         return SpamAnalysis(
-            is_spam=result.get("is_spam", False),
-            confidence=min(max(result.get("confidence", 0.5), 0.0), 1.0),
+            is_spam=is_spam,
+            confidence=confidence,
             category=SpamCategory(result.get("category", "safe")),
-            risk_level=result.get("risk_level", "low"),
+            risk_level=result.get("risk_level", default_risk),
             explanation=result.get("explanation", ""),
             detected_patterns=result.get("detected_patterns", []),
-            recommended_action=result.get("recommended_action", "allow"),
+            recommended_action=result.get("recommended_action", default_action),
         )
 
 
@@ -1,62 +1,19 @@
 """Advanced AI-powered spam detection service using Emergent LLM Key"""
-import json
 import re
 from typing import Optional, List
 import logging
+import jiter
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 from app.core.config import settings
 from app.models.message import SpamAnalysis, SpamCategory
+from app.services.spam_patterns import compile_entry_list, local_pattern_check_async
 
 logger = logging.getLogger(__name__)
 
 
-# Turkish spam patterns for local detection
-TURKISH_SPAM_PATTERNS = {
-    "betting": [
-        r"bahis", r"iddaa", r"casino", r"slot", r"rulet",
-        r"canlı\s*bahis", r"yüksek\s*oran", r"bedava\s*bonus",
-        r"free\s*bet", r"kumar", r"jackpot", r"spin",
-    ],
-    "phishing": [
-        r"şifre.*güncelle", r"hesab.*doğrula", r"acil.*giriş",
-        r"banka.*bilgi", r"kredi\s*kart", r"cvv", r"3d\s*secure",
-        r"tıkla.*kazan", r"link.*tıkla",
-    ],
-    "scam": [
-        r"para\s*kazan", r"hemen\s*kazan", r"garantili\s*gelir",
-        r"yatırım.*getiri", r"kripto.*fırsat", r"bitcoin.*kazan",
-        r"zengin\s*ol", r"pasif\s*gelir",
-    ],
-    "lottery": [
-        r"çekiliş.*kazan", r"piyango", r"şanslı\s*numara",
-        r"ödül.*kazan", r"hediye.*kazan", r"milyon.*kazan",
-    ],
-    "promotional": [
-        r"kampanya", r"indirim", r"%\d+\s*off", r"fırsat",
-        r"son\s*gün", r"acele\s*et", r"kaçırma",
-    ],
-}
-
-# English spam patterns
-ENGLISH_SPAM_PATTERNS = {
-    "betting": [
-        r"betting", r"casino", r"poker", r"slots", r"gambling",
-        r"free\s*spins", r"bonus\s*code", r"jackpot",
-    ],
-    "phishing": [
-        r"verify\s*account", r"update\s*password", r"confirm\s*identity",
-        r"suspended\s*account", r"click\s*here\s*now", r"urgent\s*action",
-    ],
-    "scam": [
-        r"make\s*money", r"earn\s*from\s*home", r"guaranteed\s*income",
-        r"crypto\s*opportunity", r"investment\s*return", r"get\s*rich",
-    ],
-    "lottery": [
-        r"you\s*won", r"prize\s*winner", r"lottery\s*winner",
-        r"claim\s*your\s*prize", r"lucky\s*number",
-    ],
-}
+# Extracts a JSON object embedded in free-form AI output
+JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
 
 
 class SpamDetector:
@@ -95,45 +52,6 @@ Respond in JSON format only:
 Be very strict about scams and betting content."""
             ).with_model("openai", "gpt-5.2")
 
-    def _local_pattern_check(self, content: str) -> Optional[SpamAnalysis]:
-        """
-        Quick local pattern matching for obvious spam
-        Returns analysis if spam detected, None otherwise
-        """
-        content_lower = content.lower()
-
-        # Check Turkish patterns
-        for category, patterns in TURKISH_SPAM_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    if category == "betting":
-                        return SpamAnalysis(
-                            is_spam=True,
-                            confidence=0.95,
-                            category=SpamCategory(category),
-                            risk_level="high",
-                            explanation=f"Yasadışı bahis/kumar içeriği tespit edildi | Illegal betting content detected ('{pattern}' pattern)",
-                            detected_patterns=[pattern],
-                            recommended_action="block",
-                        )
-
-        # Check English patterns
-        for category, patterns in ENGLISH_SPAM_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    if category in ["betting", "phishing", "scam"]:
-                        return SpamAnalysis(
-                            is_spam=True,
-                            confidence=0.90,
-                            category=SpamCategory(category),
-                            risk_level="high",
-                            explanation=f"Spam pattern detected: '{pattern}'",
-                            detected_patterns=[pattern],
-                            recommended_action="block",
-                        )
-
-        return None
-
     async def analyze(
         self,
         content: str,
@@ -158,37 +76,41 @@ Be very strict about scams and betting content."""
         whitelist = whitelist or []
         blacklist = blacklist or []
 
+        sender_lower = sender.lower() if sender else ""
+
         # Check whitelist first
         if sender:
-            for entry in whitelist:
-                if entry.lower() in sender.lower():
-                    return SpamAnalysis(
-                        is_spam=False,
-                        confidence=1.0,
-                        category=SpamCategory.SAFE,
-                        risk_level="low",
-                        explanation="Sender is whitelisted | Gönderen güvenilir listede",
-                        detected_patterns=[],
-                        recommended_action="allow",
-                    )
+            whitelist_rx = compile_entry_list(frozenset(e.lower() for e in whitelist))
+            if whitelist_rx and whitelist_rx.search(sender_lower):
+                return SpamAnalysis(
+                    is_spam=False,
+                    confidence=1.0,
+                    category=SpamCategory.SAFE,
+                    risk_level="low",
+                    explanation="Sender is whitelisted | Gönderen güvenilir listede",
+                    detected_patterns=[],
+                    recommended_action="allow",
+                )
 
         # Check blacklist
         if sender:
-            for entry in blacklist:
-                if entry.lower() in sender.lower():
-                    return SpamAnalysis(
-                        is_spam=True,
-                        confidence=1.0,
-                        category=SpamCategory.OTHER,
-                        risk_level="high",
-                        explanation="Sender is blacklisted | Gönderen kara listede",
-                        detected_patterns=[entry],
-                        recommended_action="block",
-                    )
-
-        # Quick local check first
-        local_result = self._local_pattern_check(content)
-        if local_result and local_result.confidence >= 0.9:
+            blacklist_rx = compile_entry_list(frozenset(e.lower() for e in blacklist))
+            match = blacklist_rx.search(sender_lower) if blacklist_rx else None
+            if match:
+                entry = next(e for e in blacklist if e.lower() == match.group())
+                return SpamAnalysis(
+                    is_spam=True,
+                    confidence=1.0,
+                    category=SpamCategory.OTHER,
+                    risk_level="high",
+                    explanation="Sender is blacklisted | Gönderen kara listede",
+                    detected_patterns=[entry],
+                    recommended_action="block",
+                )
+
+        # Quick local check first (long content is scanned off the event loop)
+        local_result = await local_pattern_check_async(content)
+        if local_result and local_result.confidence >= settings.LOCAL_MATCH_CONFIDENCE_THRESHOLD:
             return local_result
 
         # Use AI for deeper analysis (premium or fallback)
@@ -227,13 +149,12 @@ Be very strict about scams and betting content."""
         
         # Parse JSON response
         try:
-            result = json.loads(response)
-        except json.JSONDecodeError:
+            result = jiter.from_json(response.encode())
+        except ValueError:
             # If response is not JSON, try to extract JSON
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = JSON_OBJECT_PATTERN.search(response)
             if json_match:
-                result = json.loads(json_match.group())
+                result = jiter.from_json(json_match.group().encode())
             else:
                 raise ValueError("Could not parse AI response as JSON")
 
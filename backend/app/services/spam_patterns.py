@@ -0,0 +1,330 @@
+"""Shared spam keyword patterns and local pattern matcher"""
+import asyncio
+import hashlib
+import re
+import string
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import ahocorasick
+from cachetools import LRUCache, cached
+
+try:
+    import ahocorasick_rs
+except ImportError:  # No wheel for this platform, use pyahocorasick
+    ahocorasick_rs = None
+
+from app.models.message import SpamAnalysis, SpamCategory
+
+
+# Turkish spam patterns for local detection
+TURKISH_PATTERNS: Dict[str, List[str]] = {
+    "betting": [
+        r"bahis", r"iddaa", r"casino", r"slot", r"rulet",
+        r"canlı\s*bahis", r"yüksek\s*oran", r"bedava\s*bonus",
+        r"free\s*bet", r"kumar", r"jackpot", r"spin",
+    ],
+    "phishing": [
+        r"şifre.*güncelle", r"hesab.*doğrula", r"acil.*giriş",
+        r"banka.*bilgi", r"kredi\s*kart", r"cvv", r"3d\s*secure",
+        r"tıkla.*kazan", r"link.*tıkla",
+    ],
+    "scam": [
+        r"para\s*kazan", r"hemen\s*kazan", r"garantili\s*gelir",
+        r"yatırım.*getiri", r"kripto.*fırsat", r"bitcoin.*kazan",
+        r"zengin\s*ol", r"pasif\s*gelir",
+    ],
+    "lottery": [
+        r"çekiliş.*kazan", r"piyango", r"şanslı\s*numara",
+        r"ödül.*kazan", r"hediye.*kazan", r"milyon.*kazan",
+    ],
+    "promotional": [
+        r"kampanya", r"indirim", r"%\d+\s*off", r"fırsat",
+        r"son\s*gün", r"acele\s*et", r"kaçırma",
+    ],
+}
+
+# English spam patterns
+ENGLISH_PATTERNS: Dict[str, List[str]] = {
+    "betting": [
+        r"betting", r"casino", r"poker", r"slots", r"gambling",
+        r"free\s*spins", r"bonus\s*code", r"jackpot",
+    ],
+    "phishing": [
+        r"verify\s*account", r"update\s*password", r"confirm\s*identity",
+        r"suspended\s*account", r"click\s*here\s*now", r"urgent\s*action",
+    ],
+    "scam": [
+        r"make\s*money", r"earn\s*from\s*home", r"guaranteed\s*income",
+        r"crypto\s*opportunity", r"investment\s*return", r"get\s*rich",
+    ],
+    "lottery": [
+        r"you\s*won", r"prize\s*winner", r"lottery\s*winner",
+        r"claim\s*your\s*prize", r"lucky\s*number",
+    ],
+}
+
+# Content longer than this is pattern-checked in a worker thread
+LOCAL_CHECK_THREAD_THRESHOLD = 2048
+
+# Confidence assigned to a local match, per category
+CATEGORY_CONFIDENCE: Dict[str, float] = {
+    "betting": 0.95,
+    "phishing": 0.9,
+    "scam": 0.9,
+    "lottery": 0.8,
+    "promotional": 0.7,
+}
+
+# Highest confidence any category can reach
+MAX_CONFIDENCE = max(CATEGORY_CONFIDENCE.values())
+
+# Folds Turkish letters to their ASCII base so "BAHİS", "bahis" and "bahıs" compare equal;
+# applied before casefold(), which would otherwise turn "İ" into "i" + combining dot
+TURKISH_FOLD_TABLE = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i",
+    "Ş": "s", "ş": "s",
+    "Ğ": "g", "ğ": "g",
+    "Ü": "u", "ü": "u",
+    "Ö": "o", "ö": "o",
+    "Ç": "c", "ç": "c",
+})
+
+# Symbols used in place of letters ("b@h!s" -> "bahis"); digits are left alone
+# so OTPs and reference codes never fold into keywords
+LEET_FOLD_TABLE = str.maketrans("@$!|", "asii")
+
+# Runs of look-alike symbols with a letter on both sides
+LEET_SYMBOL_RUN = re.compile(r"(?<=[a-z])[@$!|]+(?=[a-z])")
+
+# Deletes letters, digits and whitespace, leaving only symbols
+NON_SYMBOL_TABLE = str.maketrans("", "", string.ascii_letters + string.digits + string.whitespace)
+
+# Share of symbols above which the leet-folded text is also scanned for keywords
+LEET_SYMBOL_RATIO = 0.15
+
+# Confidence of a keyword found only after leet folding; below the default
+# auto-block threshold, so such messages are flagged with "warn"
+LEET_MATCH_CONFIDENCE = 0.7
+
+# Characters that make a pattern a regex rather than a plain keyword
+REGEX_METACHARS = frozenset("\\.*+?[](){}|^$")
+
+# (category, fused alternation, source patterns) for patterns that need regex
+Matcher = Tuple[str, re.Pattern, List[str]]
+
+# Keyword automaton and regex matchers, built on first use
+_automaton: Optional["KeywordAutomaton"] = None
+_matchers: Optional[List[Matcher]] = None
+_matchers_lock = threading.Lock()
+
+
+def normalize_content(content: str) -> str:
+    """NFC-normalize, fold Turkish letters and casefold text for pattern matching"""
+    if not unicodedata.is_normalized("NFC", content):
+        content = unicodedata.normalize("NFC", content)
+    return content.translate(TURKISH_FOLD_TABLE).casefold()
+
+
+def symbol_ratio(text: str) -> float:
+    """Share of characters in text that are not ASCII letters, digits or whitespace"""
+    if not text:
+        return 0.0
+    return len(text.translate(NON_SYMBOL_TABLE)) / len(text)
+
+
+def fold_leet(text: str) -> str:
+    """Replace look-alike symbols that sit between letters with the letters they imitate"""
+    return LEET_SYMBOL_RUN.sub(lambda match: match.group().translate(LEET_FOLD_TABLE), text)
+
+
+def _is_keyword(pattern: str) -> bool:
+    """True if the pattern is a plain keyword with no regex syntax"""
+    return not REGEX_METACHARS.intersection(pattern)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton reporting every (category, keyword) hit in one pass
+    Uses the Rust ahocorasick-rs backend when installed, pyahocorasick otherwise
+    """
+
+    def __init__(self, keywords: Dict[str, Tuple[str, str]]):
+        """
+        Args:
+            keywords: Folded keyword -> (category, source keyword)
+        """
+        self._values = list(keywords.values())
+        if ahocorasick_rs is not None:
+            self._automaton = ahocorasick_rs.AhoCorasick(
+                list(keywords), matchkind=ahocorasick_rs.MatchKind.Standard
+            )
+        else:
+            self._automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(keywords):
+                self._automaton.add_word(keyword, index)
+            self._automaton.make_automaton()
+
+    def iter_hits(self, text: str) -> Iterator[Tuple[str, str]]:
+        """Yield (category, source keyword) for every keyword occurrence in text"""
+        if ahocorasick_rs is not None:
+            for index, _, _ in self._automaton.find_matches_as_indexes(text, overlapping=True):
+                yield self._values[index]
+        else:
+            for _, index in self._automaton.iter(text):
+                yield self._values[index]
+
+
+def _build_automaton(pattern_sets: List[Dict[str, List[str]]]) -> KeywordAutomaton:
+    """Build one automaton over every plain keyword of every language"""
+    keywords: Dict[str, Tuple[str, str]] = {}
+    for patterns in pattern_sets:
+        for category, items in patterns.items():
+            for keyword in filter(_is_keyword, items):
+                keywords.setdefault(normalize_content(keyword), (category, keyword))
+    return KeywordAutomaton(keywords)
+
+
+def _build_matchers(pattern_sets: List[Dict[str, List[str]]]) -> List[Matcher]:
+    """
+    Fuse each category's regex patterns into a single named-group alternation
+    Patterns are pre-folded like the content, so no case-insensitive flag is needed
+    """
+    matchers = []
+    for patterns in pattern_sets:
+        for category, items in patterns.items():
+            regexes = [pattern for pattern in items if not _is_keyword(pattern)]
+            if not regexes:
+                continue
+            matchers.append((
+                category,
+                re.compile("|".join(
+                    f"(?P<p{i}>{normalize_content(pattern)})"
+                    for i, pattern in enumerate(regexes)
+                )),
+                regexes,
+            ))
+    return matchers
+
+
+def _get_matchers() -> Tuple[KeywordAutomaton, List[Matcher]]:
+    """Return the keyword automaton and regex matchers, building them once per process"""
+    global _automaton, _matchers
+    if _matchers is None:
+        with _matchers_lock:
+            if _matchers is None:
+                pattern_sets = [TURKISH_PATTERNS, ENGLISH_PATTERNS]
+                _automaton = _build_automaton(pattern_sets)
+                _matchers = _build_matchers(pattern_sets)
+    return _automaton, _matchers
+
+
+def _search(matcher: Matcher, text: str) -> Optional[str]:
+    """Return the source pattern that matched, or None"""
+    _, regex, patterns = matcher
+    match = regex.search(text)
+    if not match:
+        return None
+    return patterns[int(match.lastgroup[1:])]
+
+
+def _best_keyword_hit(
+    automaton: KeywordAutomaton,
+    text: str,
+    best: Optional[Tuple[float, str, str]],
+) -> Optional[Tuple[float, str, str]]:
+    """
+    Return the most confident (confidence, category, keyword) hit in text, or best if none beats it
+    Stops early once nothing can beat the match (long messages rarely need the full walk)
+    """
+    for category, keyword in automaton.iter_hits(text):
+        confidence = CATEGORY_CONFIDENCE[category]
+        if not best or confidence > best[0]:
+            best = (confidence, category, keyword)
+            if confidence == MAX_CONFIDENCE:
+                break
+    return best
+
+
+def content_key(content: str) -> bytes:
+    """Fixed-size fingerprint of the content, so cached entries don't hold message bodies"""
+    return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+
+def _cache_key(content: str, key: Optional[bytes] = None) -> bytes:
+    """Use the caller's precomputed fingerprint when given"""
+    return key or content_key(content)
+
+
+# Spam campaigns send the same body to many numbers, so verdicts are memoized by content
+@cached(LRUCache(maxsize=10_000), key=_cache_key, lock=threading.Lock())
+def local_pattern_check(content: str, key: Optional[bytes] = None) -> Optional[SpamAnalysis]:
+    """
+    Quick local pattern matching for obvious spam
+    Returns analysis for the most confident matched category, None otherwise
+    The returned analysis is shared between callers (SpamAnalysis is frozen)
+
+    Args:
+        content: Message text
+        key: content_key(content), if the caller already has it
+    """
+    automaton, matchers = _get_matchers()
+    text = normalize_content(content)
+
+    best = _best_keyword_hit(automaton, text, None)
+
+    # Symbol-heavy text may be spelling keywords with look-alike characters; such
+    # hits are weaker evidence, so they are capped below the block threshold
+    if not best and symbol_ratio(text) > LEET_SYMBOL_RATIO:
+        leet = _best_keyword_hit(automaton, fold_leet(text), None)
+        if leet:
+            best = (min(leet[0], LEET_MATCH_CONFIDENCE), leet[1], leet[2])
+
+    # Regex patterns only for categories that can still beat the keyword match
+    for matcher in matchers:
+        category = matcher[0]
+        confidence = CATEGORY_CONFIDENCE[category]
+        if best and confidence <= best[0]:
+            continue
+        pattern = _search(matcher, text)
+        if pattern:
+            best = (confidence, category, pattern)
+
+    if not best:
+        return None
+
+    confidence, category, pattern = best
+    if category == "betting":
+        explanation = f"Yasadışı bahis/kumar içeriği tespit edildi | Illegal betting content detected ('{pattern}' pattern)"
+    else:
+        explanation = f"Spam pattern detected: '{pattern}'"
+
+    return SpamAnalysis(
+        is_spam=True,
+        confidence=confidence,
+        category=SpamCategory(category),
+        risk_level="high" if confidence >= 0.9 else "medium",
+        explanation=explanation,
+        detected_patterns=[pattern],
+        recommended_action="block" if confidence >= 0.9 else "warn",
+    )
+
+
+async def local_pattern_check_async(
+    content: str, key: Optional[bytes] = None
+) -> Optional[SpamAnalysis]:
+    """local_pattern_check, run off the event loop for long content"""
+    if len(content) > LOCAL_CHECK_THREAD_THRESHOLD:
+        return await asyncio.to_thread(local_pattern_check, content, key)
+    return local_pattern_check(content, key)
+
+
+@lru_cache(maxsize=1024)
+def compile_entry_list(items: FrozenSet[str]) -> Optional[re.Pattern]:
+    """Compile lowercased whitelist/blacklist entries into one alternation"""
+    if not items:
+        return None
+    # Sorted so the alternation order (and which entry wins) doesn't depend on set order
+    return re.compile("|".join(map(re.escape, sorted(items))))
@@ -1,9 +1,11 @@
 """Community spam reporting service"""
-from datetime import datetime
 from typing import Dict, Optional, List
+import numpy as np
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import UpdateOne
 
+from app.core.clock import utc_now
 from app.models.spam_report import (
     SpamReportCreate,
     SpamReportInDB,
@@ -13,6 +15,27 @@ from app.models.spam_report import (
 )
 
 
+def compute_spam_scores(
+    total_reports: np.ndarray,
+    days_since_last_report: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized spam score for a batch of phone numbers.
+
+    10 points per report (max 100), minus 1 point for every full week
+    without a new report (max 20 points of decay).
+
+    Args:
+        total_reports: Report counts per phone number
+        days_since_last_report: Days elapsed since each number's last report
+
+    Returns:
+        Array of spam scores clamped to 0-100
+    """
+    scores = np.minimum(100, total_reports * 10) - np.clip(days_since_last_report // 7, 0, 20)
+    return np.clip(scores, 0, 100)
+
+
 class SpamReportService:
     """Service for managing community spam reports"""
 
@@ -44,8 +67,8 @@ class SpamReportService:
             reason=report.reason,
             caller_name=report.caller_name,
             reported_by=user_id,
-            created_at=datetime.utcnow(),
-        ).dict()
+            created_at=utc_now(),
+        ).model_dump()
 
         # Insert individual report
         result = await self.spam_reports.insert_one(report_doc)
@@ -68,7 +91,7 @@ class SpamReportService:
             user_id: ID of user reporting
         """
         phone_number = report.phone_number
-        now = datetime.utcnow()
+        now = utc_now()
 
         # Check if phone number already has spam data
         existing = await self.community_spam.find_one(
@@ -117,7 +140,7 @@ class SpamReportService:
                 last_reported=now,
                 is_verified=False,
                 caller_names=[report.caller_name] if report.caller_name else [],
-            ).dict()
+            ).model_dump()
 
             await self.community_spam.insert_one(spam_doc)
 
@@ -183,15 +206,22 @@ class SpamReportService:
             List of spam reports
         """
         cursor = self.spam_reports.find(
-            {"reported_by": user_id}
-        ).sort("created_at", -1).skip(skip).limit(limit)
-
-        reports = []
-        async for report in cursor:
-            report["id"] = str(report.pop("_id"))
-            reports.append(report)
-
-        return reports
+            {"reported_by": user_id},
+            projection={
+                "phone_number": 1,
+                "category": 1,
+                "reason": 1,
+                "caller_name": 1,
+                "reported_by": 1,
+                "created_at": 1,
+            },
+        ).sort("created_at", -1).skip(skip).limit(limit).batch_size(limit)
+
+        # Fetch the whole page in one batch instead of iterating row by row
+        docs = await cursor.to_list(length=limit)
+        for doc in docs:
+            doc["id"] = str(doc.pop("_id"))
+        return docs
 
     async def get_top_spam_numbers(
         self,
@@ -234,6 +264,55 @@ class SpamReportService:
 
         return results
 
+    async def rescore_community_spam(self, batch_size: int = 100_000) -> int:
+        """
+        Recompute spam scores for all community spam records.
+
+        Intended for an offline/nightly job: records are loaded in batches,
+        scored with a single vectorized pass and written back with an
+        unordered bulk write.
+
+        Args:
+            batch_size: Number of records scored per batch
+
+        Returns:
+            Number of records whose spam score changed
+        """
+        now = np.datetime64(utc_now(), "s")
+        cursor = self.community_spam.find(
+            {},
+            projection={"total_reports": 1, "spam_score": 1, "last_reported": 1},
+        ).batch_size(batch_size)
+
+        updated = 0
+        while True:
+            docs = await cursor.to_list(length=batch_size)
+            if not docs:
+                break
+
+            total_reports = np.fromiter(
+                (doc.get("total_reports", 0) for doc in docs),
+                dtype=np.int32,
+                count=len(docs),
+            )
+            last_reported = np.array(
+                [doc.get("last_reported") or now for doc in docs],
+                dtype="datetime64[s]",
+            )
+            days_idle = ((now - last_reported) // np.timedelta64(1, "D")).astype(np.int32)
+            scores = compute_spam_scores(total_reports, days_idle)
+
+            operations = [
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"spam_score": int(score)}})
+                for doc, score in zip(docs, scores)
+                if doc.get("spam_score") != score
+            ]
+            if operations:
+                result = await self.community_spam.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+
+        return updated
+
     async def check_user_reported(
         self,
         phone_number: str,
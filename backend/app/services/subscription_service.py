@@ -1,8 +1,13 @@
 """Subscription service for managing user subscriptions"""
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from cachetools import TTLCache
 
+from app.core.clock import utc_now
 from app.core.database import database
 from app.core.config import settings
 from app.models.subscription import (
@@ -14,6 +19,58 @@ from app.models.subscription import (
 
 logger = logging.getLogger(__name__)
 
+# Short-lived per-process cache of the subscription tier keyed by user_id;
+# None is cached for users without a subscription. Status is not cached:
+# cancelled subscriptions keep their tier until the end of the period
+_subscription_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_NOT_CACHED = object()
+
+# Subscription fields read by the service
+SUBSCRIPTION_PROJECTION = {
+    "user_id": 1,
+    "tier": 1,
+    "status": 1,
+    "start_date": 1,
+    "end_date": 1,
+    "auto_renew": 1,
+}
+
+
+def invalidate_subscription_cache(user_id: str) -> None:
+    """Drop a user's cached subscription after it changes"""
+    _subscription_cache.pop(user_id, None)
+
+
+async def sync_user_subscription(user_id: str, tier: str, status: str) -> None:
+    """
+    Mirror subscription tier and status onto the user document
+
+    The subscriptions collection stays the source of truth; the copy on
+    the user lets authorization checks skip the subscriptions lookup.
+    """
+    await database.db["users"].update_one(
+        {"_id": ObjectId(user_id)},
+        {"$set": {"tier": tier, "subscription_status": status}}
+    )
+    invalidate_subscription_cache(user_id)
+
+
+def daily_usage_key(user_id: str, day: datetime) -> str:
+    """Build the _id of a user's usage counter document for a given day"""
+    return f"{user_id}:{day:%Y%m%d}"
+
+
+# Start of the current UTC day, rebuilt only when the day rolls over
+_DAY_CACHE = {"day": None, "start": None}
+
+
+def utc_day_start(now: Optional[datetime] = None) -> datetime:
+    """Return midnight (UTC) of the day containing `now` (default: current time)"""
+    today = (now or utc_now()).date()
+    if _DAY_CACHE["day"] != today:
+        _DAY_CACHE.update(day=today, start=datetime.combine(today, time.min))
+    return _DAY_CACHE["start"]
+
 
 class SubscriptionService:
     """Service for managing user subscriptions"""
@@ -31,8 +88,14 @@ class SubscriptionService:
         Returns:
             SubscriptionResponse with subscription details
         """
-        # Get subscription from database
-        subscription = await database.db["subscriptions"].find_one({"user_id": user_id})
+        # Subscription and today's usage counter are independent lookups
+        subscription, used = await asyncio.gather(
+            database.db["subscriptions"].find_one(
+                {"user_id": user_id},
+                SUBSCRIPTION_PROJECTION
+            ),
+            self._get_usage_count(user_id),
+        )
         
         # If no subscription, create free tier
         if not subscription:
@@ -42,16 +105,13 @@ class SubscriptionService:
         tier = SubscriptionTier(subscription["tier"])
         plan = SUBSCRIPTION_PLANS[tier]
         
-        # Get daily usage
-        daily_usage = await self.get_daily_usage(user_id)
-        
         return SubscriptionResponse(
             tier=tier,
             status=SubscriptionStatus(subscription["status"]),
             start_date=subscription["start_date"],
             end_date=subscription.get("end_date"),
             daily_limit=plan.daily_limit,
-            daily_usage=daily_usage["used"],
+            daily_usage=used,
             auto_renew=subscription.get("auto_renew", False),
             features=plan.features
         )
@@ -62,14 +122,22 @@ class SubscriptionService:
             "user_id": user_id,
             "tier": SubscriptionTier.FREE.value,
             "status": SubscriptionStatus.ACTIVE.value,
-            "start_date": datetime.utcnow(),
+            "start_date": utc_now(),
             "end_date": None,
             "auto_renew": False,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": utc_now(),
+            "updated_at": utc_now()
         }
         
-        await database.db["subscriptions"].insert_one(subscription)
+        # Upsert so concurrent first requests share one document instead of
+        # tripping the unique user_id index; returns whichever insert won
+        subscription = await database.db["subscriptions"].find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": subscription},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        await sync_user_subscription(user_id, subscription["tier"], subscription["status"])
         return subscription
 
     async def get_daily_usage(self, user_id: str) -> dict:
@@ -83,21 +151,30 @@ class SubscriptionService:
             Dict with limit, used, and remaining counts
         """
         # Get subscription
-        subscription = await database.db["subscriptions"].find_one({"user_id": user_id})
+        subscription = await database.db["subscriptions"].find_one(
+            {"user_id": user_id},
+            {"user_id": 1, "tier": 1}
+        )
         
         if not subscription:
             subscription = await self._create_free_subscription(user_id)
         
+        return await self._compute_daily_usage(subscription)
+
+    async def _compute_daily_usage(self, subscription: dict) -> dict:
+        """
+        Compute daily usage for an already loaded subscription
+        
+        Args:
+            subscription: Subscription document
+            
+        Returns:
+            Dict with limit, used, and remaining counts
+        """
         tier = SubscriptionTier(subscription["tier"])
         plan = SUBSCRIPTION_PLANS[tier]
         
-        # Count messages analyzed today
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        count = await database.db["messages"].count_documents({
-            "user_id": user_id,
-            "created_at": {"$gte": today_start}
-        })
+        count = await self._get_usage_count(subscription["user_id"])
         
         return {
             "limit": plan.daily_limit,
@@ -105,17 +182,33 @@ class SubscriptionService:
             "remaining": max(0, plan.daily_limit - count)
         }
 
-    async def check_usage_limit(self, user_id: str) -> bool:
+    async def _get_usage_count(self, user_id: str) -> int:
+        """Read today's usage counter (maintained by MessageService)"""
+        usage_doc = await database.db["daily_usage"].find_one(
+            {"_id": daily_usage_key(user_id, utc_day_start())},
+            {"count": 1}
+        )
+        return usage_doc["count"] if usage_doc else 0
+
+    async def check_usage_limit(
+        self,
+        user_id: str,
+        subscription: Optional[dict] = None,
+    ) -> bool:
         """
         Check if user has reached daily usage limit
         
         Args:
             user_id: User ID
+            subscription: Already loaded subscription document, if available
             
         Returns:
             True if user can use service, False if limit reached
         """
-        usage = await self.get_daily_usage(user_id)
+        if subscription is not None:
+            usage = await self._compute_daily_usage(subscription)
+        else:
+            usage = await self.get_daily_usage(user_id)
         return usage["remaining"] > 0
 
     async def cancel_subscription(self, user_id: str) -> bool:
@@ -128,10 +221,13 @@ class SubscriptionService:
         Returns:
             True if cancelled, False if no active subscription
         """
-        subscription = await database.db["subscriptions"].find_one({
-            "user_id": user_id,
-            "status": SubscriptionStatus.ACTIVE.value
-        })
+        subscription = await database.db["subscriptions"].find_one(
+            {
+                "user_id": user_id,
+                "status": SubscriptionStatus.ACTIVE.value
+            },
+            {"tier": 1}
+        )
         
         if not subscription or subscription["tier"] == SubscriptionTier.FREE.value:
             return False
@@ -143,11 +239,16 @@ class SubscriptionService:
                 "$set": {
                     "status": SubscriptionStatus.CANCELLED.value,
                     "auto_renew": False,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": utc_now()
                 }
             }
         )
         
+        await sync_user_subscription(
+            user_id,
+            subscription["tier"],
+            SubscriptionStatus.CANCELLED.value
+        )
         logger.info(f"Subscription cancelled for user: {user_id}")
         return True
 
@@ -161,10 +262,25 @@ class SubscriptionService:
         Returns:
             True if premium/pro, False otherwise
         """
-        subscription = await database.db["subscriptions"].find_one({"user_id": user_id})
+        cached = _subscription_cache.get(user_id, _NOT_CACHED)
+        if cached is _NOT_CACHED:
+            user_doc = await database.db["users"].find_one(
+                {"_id": ObjectId(user_id)},
+                {"tier": 1}
+            )
+            if user_doc and user_doc.get("tier"):
+                cached = user_doc["tier"]
+            else:
+                # Users created before the tier was denormalized
+                subscription = await database.db["subscriptions"].find_one(
+                    {"user_id": user_id},
+                    {"tier": 1}
+                )
+                cached = subscription["tier"] if subscription else None
+            _subscription_cache[user_id] = cached
         
-        if not subscription:
+        if not cached:
             return False
         
-        tier = SubscriptionTier(subscription["tier"])
+        tier = SubscriptionTier(cached)
         return tier in [SubscriptionTier.PREMIUM, SubscriptionTier.PRO]
@@ -1,8 +1,10 @@
 """User and settings management service"""
-from datetime import datetime
+import asyncio
 from typing import Optional, List
 from bson import ObjectId
+from pymongo import ReturnDocument
 
+from app.core.clock import utc_now
 from app.models.user import UserResponse
 from app.models.settings import (
     UserSettings,
@@ -11,6 +13,60 @@ from app.models.settings import (
     BlacklistEntry,
 )
 from app.core.security import get_password_hash, verify_password
+from app.services.subscription_service import invalidate_subscription_cache
+
+# User fields needed to build a UserResponse
+PROFILE_PROJECTION = {
+    "email": 1,
+    "full_name": 1,
+    "phone": 1,
+    "language": 1,
+    "is_active": 1,
+    "is_verified": 1,
+    "created_at": 1,
+    "total_messages_analyzed": 1,
+    "total_spam_blocked": 1,
+}
+
+# Settings fields needed to build a UserSettings
+SETTINGS_PROJECTION = {
+    "auto_block_spam": 1,
+    "auto_block_threshold": 1,
+    "notifications_enabled": 1,
+    "language": 1,
+    "whitelist": 1,
+    "blacklist": 1,
+    "block_categories": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+
+# Largest element count accepted by $slice
+MAX_SLICE = 2**31 - 1
+
+
+def _list_projection(skip: int, limit: Optional[int]):
+    """Projection for one list: the whole list unless a page is requested"""
+    if not skip and limit is None:
+        return 1
+    return {"$slice": [skip, MAX_SLICE if limit is None else limit]}
+
+
+def _settings_page_projection(
+    wl_skip: int = 0,
+    wl_limit: Optional[int] = None,
+    bl_skip: int = 0,
+    bl_limit: Optional[int] = None,
+) -> dict:
+    """Settings projection returning each list (or a page of it) plus their sizes"""
+    return {
+        **SETTINGS_PROJECTION,
+        "whitelist": _list_projection(wl_skip, wl_limit),
+        "blacklist": _list_projection(bl_skip, bl_limit),
+        "whitelist_total": {"$size": {"$ifNull": ["$whitelist", []]}},
+        "blacklist_total": {"$size": {"$ifNull": ["$blacklist", []]}},
+    }
 
 
 class UserService:
@@ -21,34 +77,26 @@ class UserService:
         self.users = db["users"]
         self.settings = db["settings"]
 
-    async def get_profile(self, user_id: str) -> Optional[UserResponse]:
+    async def get_profile(self, user_oid: ObjectId) -> Optional[UserResponse]:
         """Get user profile"""
-        user_doc = await self.users.find_one({"_id": ObjectId(user_id)})
+        user_doc = await self.users.find_one(
+            {"_id": user_oid},
+            projection=PROFILE_PROJECTION,
+        )
         if not user_doc:
             return None
 
-        return UserResponse(
-            id=str(user_doc["_id"]),
-            email=user_doc["email"],
-            full_name=user_doc["full_name"],
-            phone=user_doc.get("phone"),
-            language=user_doc.get("language", "tr"),
-            is_active=user_doc.get("is_active", True),
-            is_verified=user_doc.get("is_verified", False),
-            created_at=user_doc["created_at"],
-            total_messages_analyzed=user_doc.get("total_messages_analyzed", 0),
-            total_spam_blocked=user_doc.get("total_spam_blocked", 0),
-        )
+        return self._to_user_response(user_doc)
 
     async def update_profile(
         self,
-        user_id: str,
+        user_oid: ObjectId,
         full_name: Optional[str] = None,
         phone: Optional[str] = None,
         language: Optional[str] = None,
     ) -> Optional[UserResponse]:
         """Update user profile"""
-        update_fields = {"updated_at": datetime.utcnow()}
+        update_fields = {"updated_at": utc_now()}
 
         if full_name:
             update_fields["full_name"] = full_name
@@ -57,24 +105,29 @@ class UserService:
         if language:
             update_fields["language"] = language
 
-        result = await self.users.update_one(
-            {"_id": ObjectId(user_id)},
+        user_doc = await self.users.find_one_and_update(
+            {"_id": user_oid},
             {"$set": update_fields},
+            projection=PROFILE_PROJECTION,
+            return_document=ReturnDocument.AFTER,
         )
 
-        if result.modified_count == 0:
+        if not user_doc:
             return None
 
-        return await self.get_profile(user_id)
+        return self._to_user_response(user_doc)
 
     async def change_password(
         self,
-        user_id: str,
+        user_oid: ObjectId,
         current_password: str,
         new_password: str,
     ) -> bool:
         """Change user password"""
-        user_doc = await self.users.find_one({"_id": ObjectId(user_id)})
+        user_doc = await self.users.find_one(
+            {"_id": user_oid},
+            projection={"hashed_password": 1},
+        )
         if not user_doc:
             return False
 
@@ -84,41 +137,34 @@ class UserService:
 
         # Update password
         result = await self.users.update_one(
-            {"_id": ObjectId(user_id)},
+            {"_id": user_doc["_id"]},
             {
                 "$set": {
                     "hashed_password": get_password_hash(new_password),
-                    "updated_at": datetime.utcnow(),
+                    "updated_at": utc_now(),
                 }
             },
         )
 
         return result.modified_count > 0
 
-    async def get_settings(self, user_id: str) -> Optional[UserSettings]:
-        """Get user settings"""
-        settings_doc = await self.settings.find_one({"user_id": user_id})
+    async def get_settings(
+        self,
+        user_id: str,
+        wl_skip: int = 0,
+        wl_limit: Optional[int] = None,
+        bl_skip: int = 0,
+        bl_limit: Optional[int] = None,
+    ) -> Optional[UserSettings]:
+        """Get user settings, optionally with only a page of the whitelist and blacklist"""
+        settings_doc = await self.settings.find_one(
+            {"user_id": user_id},
+            projection=_settings_page_projection(wl_skip, wl_limit, bl_skip, bl_limit),
+        )
         if not settings_doc:
             return None
 
-        return UserSettings(
-            user_id=user_id,
-            auto_block_spam=settings_doc.get("auto_block_spam", True),
-            auto_block_threshold=settings_doc.get("auto_block_threshold", 0.8),
-            notifications_enabled=settings_doc.get("notifications_enabled", True),
-            language=settings_doc.get("language", "tr"),
-            whitelist=[
-                WhitelistEntry(**entry)
-                for entry in settings_doc.get("whitelist", [])
-            ],
-            blacklist=[
-                BlacklistEntry(**entry)
-                for entry in settings_doc.get("blacklist", [])
-            ],
-            block_categories=settings_doc.get("block_categories", []),
-            created_at=settings_doc.get("created_at", datetime.utcnow()),
-            updated_at=settings_doc.get("updated_at", datetime.utcnow()),
-        )
+        return self._to_user_settings(user_id, settings_doc)
 
     async def update_settings(
         self,
@@ -126,7 +172,7 @@ class UserService:
         update_data: SettingsUpdate,
     ) -> Optional[UserSettings]:
         """Update user settings"""
-        update_fields = {"updated_at": datetime.utcnow()}
+        update_fields = {"updated_at": utc_now()}
 
         if update_data.auto_block_spam is not None:
             update_fields["auto_block_spam"] = update_data.auto_block_spam
@@ -139,12 +185,16 @@ class UserService:
         if update_data.block_categories is not None:
             update_fields["block_categories"] = update_data.block_categories
 
-        result = await self.settings.update_one(
+        settings_doc = await self.settings.find_one_and_update(
             {"user_id": user_id},
             {"$set": update_fields},
+            projection=_settings_page_projection(),
+            return_document=ReturnDocument.AFTER,
         )
+        if not settings_doc:
+            return None
 
-        return await self.get_settings(user_id)
+        return self._to_user_settings(user_id, settings_doc)
 
     async def add_to_whitelist(
         self,
@@ -153,18 +203,26 @@ class UserService:
         entry_type: str,
         note: Optional[str] = None,
     ) -> bool:
-        """Add entry to whitelist"""
+        """
+        Add entry to whitelist, returns False if the user has no settings
+
+        Raises:
+            ValueError: If the value is already whitelisted
+        """
         entry = {
             "value": value,
             "type": entry_type,
             "note": note,
-            "created_at": datetime.utcnow(),
+            "created_at": utc_now(),
         }
 
+        # The filter only matches while the value is absent, so duplicates are rejected server-side
         result = await self.settings.update_one(
-            {"user_id": user_id},
-            {"$push": {"whitelist": entry}, "$set": {"updated_at": datetime.utcnow()}},
+            {"user_id": user_id, "whitelist.value": {"$ne": value}},
+            {"$push": {"whitelist": entry}, "$set": {"updated_at": utc_now()}},
         )
+        if not result.modified_count and await self._has_settings(user_id):
+            raise ValueError("Already in whitelist")
 
         return result.modified_count > 0
 
@@ -174,7 +232,7 @@ class UserService:
             {"user_id": user_id},
             {
                 "$pull": {"whitelist": {"value": value}},
-                "$set": {"updated_at": datetime.utcnow()},
+                "$set": {"updated_at": utc_now()},
             },
         )
         return result.modified_count > 0
@@ -186,41 +244,95 @@ class UserService:
         entry_type: str,
         reason: Optional[str] = None,
     ) -> bool:
-        """Add entry to blacklist"""
+        """
+        Add entry to blacklist, returns False if the user has no settings
+
+        Raises:
+            ValueError: If the value is already blacklisted
+        """
         entry = {
             "value": value,
             "type": entry_type,
             "reason": reason,
-            "created_at": datetime.utcnow(),
+            "created_at": utc_now(),
         }
 
+        # The filter only matches while the value is absent, so duplicates are rejected server-side
         result = await self.settings.update_one(
-            {"user_id": user_id},
-            {"$push": {"blacklist": entry}, "$set": {"updated_at": datetime.utcnow()}},
+            {"user_id": user_id, "blacklist.value": {"$ne": value}},
+            {"$push": {"blacklist": entry}, "$set": {"updated_at": utc_now()}},
         )
+        if not result.modified_count and await self._has_settings(user_id):
+            raise ValueError("Already in blacklist")
 
         return result.modified_count > 0
 
+    async def _has_settings(self, user_id: str) -> bool:
+        """Check whether the user's settings document exists"""
+        return await self.settings.count_documents({"user_id": user_id}, limit=1) > 0
+
     async def remove_from_blacklist(self, user_id: str, value: str) -> bool:
         """Remove entry from blacklist"""
         result = await self.settings.update_one(
             {"user_id": user_id},
             {
                 "$pull": {"blacklist": {"value": value}},
-                "$set": {"updated_at": datetime.utcnow()},
+                "$set": {"updated_at": utc_now()},
             },
         )
         return result.modified_count > 0
 
-    async def delete_account(self, user_id: str) -> bool:
+    async def delete_account(self, user_oid: ObjectId) -> bool:
         """Delete user account and all data"""
-        # Delete messages
-        await self.db["messages"].delete_many({"user_id": user_id})
+        user_id = str(user_oid)
+        # The deletes are independent, so issue them concurrently
+        *_, result = await asyncio.gather(
+            self.db["messages"].delete_many({"user_id": user_id}),
+            self.db["daily_usage"].delete_many({"user_id": user_id}),
+            self.db["subscriptions"].delete_many({"user_id": user_id}),
+            self.settings.delete_one({"user_id": user_id}),
+            self.users.delete_one({"_id": user_oid}),
+        )
+        invalidate_subscription_cache(user_id)
 
-        # Delete settings
-        await self.settings.delete_one({"user_id": user_id})
+        return result.deleted_count > 0
 
-        # Delete user
-        result = await self.users.delete_one({"_id": ObjectId(user_id)})
+    @staticmethod
+    def _to_user_response(user_doc: dict) -> UserResponse:
+        """Build a UserResponse from a user document"""
+        return UserResponse(
+            id=str(user_doc["_id"]),
+            email=user_doc["email"],
+            full_name=user_doc["full_name"],
+            phone=user_doc.get("phone"),
+            language=user_doc.get("language", "tr"),
+            is_active=user_doc.get("is_active", True),
+            is_verified=user_doc.get("is_verified", False),
+            created_at=user_doc["created_at"],
+            total_messages_analyzed=user_doc.get("total_messages_analyzed", 0),
+            total_spam_blocked=user_doc.get("total_spam_blocked", 0),
+        )
 
-        return result.deleted_count > 0
+    @staticmethod
+    def _to_user_settings(user_id: str, settings_doc: dict) -> UserSettings:
+        """Build UserSettings from a settings document"""
+        return UserSettings(
+            user_id=user_id,
+            auto_block_spam=settings_doc.get("auto_block_spam", True),
+            auto_block_threshold=settings_doc.get("auto_block_threshold", 0.8),
+            notifications_enabled=settings_doc.get("notifications_enabled", True),
+            language=settings_doc.get("language", "tr"),
+            whitelist=[
+                WhitelistEntry(**entry)
+                for entry in settings_doc.get("whitelist", [])
+            ],
+            blacklist=[
+                BlacklistEntry(**entry)
+                for entry in settings_doc.get("blacklist", [])
+            ],
+            whitelist_total=settings_doc.get("whitelist_total", 0),
+            blacklist_total=settings_doc.get("blacklist_total", 0),
+            block_categories=settings_doc.get("block_categories", []),
+            created_at=settings_doc.get("created_at", utc_now()),
+            updated_at=settings_doc.get("updated_at", utc_now()),
+        )
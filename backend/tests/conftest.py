@@ -1,56 +1,110 @@
 """Pytest configuration and fixtures"""
 import pytest
 import asyncio
-from typing import AsyncGenerator, Generator
-from httpx import AsyncClient
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import AsyncGenerator
+from httpx import ASGITransport, AsyncClient
+from pytest_asyncio import is_async_test
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
 
 from app.main import app
 from app.core.database import database
 from app.core.config import settings
+from app.core.security import pwd_context
 
 
 # Test database name
 TEST_DB_NAME = "nexura_test_db"
 
+# Users registered by individual tests (the shared session user is kept)
+TEST_EMAILS = [
+    "newuser@example.com",
+    "duplicate@example.com",
+    "logintest@example.com",
+    "refresh@example.com",
+    "pwchange@example.com",
+]
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session loop shared with the app and database fixtures"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
 
 @pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """Create event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Use uvloop's libuv-based event loop where it is available"""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
 
 
 @pytest.fixture(scope="session")
 async def test_db():
     """Set up test database"""
-    # Use test database
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
-    db = client[TEST_DB_NAME]
+    # Run the app's startup once for the whole session, against the test database
+    original_database_name = settings.DATABASE_NAME
+    settings.DATABASE_NAME = TEST_DB_NAME
+    try:
+        async with app.router.lifespan_context(app):
+            yield database.db
+
+            # Cleanup: drop test database
+            await database.client.drop_database(TEST_DB_NAME)
+    finally:
+        settings.DATABASE_NAME = original_database_name
+
+
+@pytest.fixture(scope="session")
+def transport(test_db) -> ASGITransport:
+    """ASGI transport to the already started app"""
+    return ASGITransport(app=app)
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_test_users(request):
+    """Remove users registered by a test once it finishes (only for tests using the database)"""
+    if "test_db" not in request.fixturenames:
+        yield
+        return
 
-    # Override the database instance
-    database.client = client
-    database.db = db
+    test_db = request.getfixturevalue("test_db")
+    yield
+    await test_db["users"].delete_many({"email": {"$in": TEST_EMAILS}})
 
-    yield db
 
-    # Cleanup: drop test database
-    await client.drop_database(TEST_DB_NAME)
-    client.close()
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Use the minimum bcrypt cost so registrations and logins stay cheap"""
+    original = pwd_context.to_dict()
+    pwd_context.update(bcrypt__rounds=4)
+    yield
+    pwd_context.load(original)
 
 
 @pytest.fixture
-async def client(test_db) -> AsyncGenerator:
+async def client(transport: ASGITransport) -> AsyncGenerator:
     """Create async HTTP client for testing"""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
 
-@pytest.fixture
-async def authenticated_client(client: AsyncClient, test_db) -> AsyncGenerator:
-    """Create authenticated client with test user"""
-    # Register a test user
+@pytest.fixture(scope="session")
+async def app_client(transport: ASGITransport) -> AsyncGenerator:
+    """Async HTTP client shared by the whole session"""
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture(scope="session")
+async def session_token(app_client: AsyncClient) -> str:
+    """Register (or log in) the test user once and return its access token"""
     user_data = {
         "email": "test@example.com",
         "password": "testpassword123",
@@ -58,20 +112,30 @@ async def authenticated_client(client: AsyncClient, test_db) -> AsyncGenerator:
         "language": "en",
     }
 
-    response = await client.post("/api/v1/auth/register", json=user_data)
+    response = await app_client.post("/api/v1/auth/register", json=user_data)
 
-    if response.status_code == 201:
-        token = response.json()["access_token"]
-    else:
+    if response.status_code != 201:
         # User might already exist, try login
-        response = await client.post(
+        response = await app_client.post(
             "/api/v1/auth/login",
             json={"email": user_data["email"], "password": user_data["password"]},
         )
-        token = response.json()["access_token"]
 
-    client.headers["Authorization"] = f"Bearer {token}"
-    yield client
+    return response.json()["access_token"]
+
+
+@pytest.fixture
+async def authenticated_client(app_client: AsyncClient, session_token: str) -> AsyncGenerator:
+    """
+    Shared client authenticated as the test user
+
+    Tests that switch users or headers should use `client` instead.
+    """
+    app_client.headers["Authorization"] = f"Bearer {session_token}"
+    try:
+        yield app_client
+    finally:
+        app_client.headers.pop("Authorization", None)
 
 
 @pytest.fixture
@@ -1,14 +1,9 @@
 """Tests for authentication endpoints"""
-import pytest
 from httpx import AsyncClient
 
 
-@pytest.mark.asyncio
-async def test_register_success(client: AsyncClient, test_db):
+async def test_register_success(client: AsyncClient):
     """Test successful user registration"""
-    # Clean up any existing user
-    await test_db["users"].delete_one({"email": "newuser@example.com"})
-
     response = await client.post(
         "/api/v1/auth/register",
         json={
@@ -28,7 +23,6 @@ async def test_register_success(client: AsyncClient, test_db):
     assert data["user"]["language"] == "tr"
 
 
-@pytest.mark.asyncio
 async def test_register_duplicate_email(client: AsyncClient, test_db):
     """Test registration with existing email"""
     # First, ensure user exists
@@ -55,7 +49,6 @@ async def test_register_duplicate_email(client: AsyncClient, test_db):
     assert "already registered" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
 async def test_register_invalid_email(client: AsyncClient):
     """Test registration with invalid email"""
     response = await client.post(
@@ -70,7 +63,6 @@ async def test_register_invalid_email(client: AsyncClient):
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
 async def test_register_short_password(client: AsyncClient):
     """Test registration with short password"""
     response = await client.post(
@@ -85,11 +77,9 @@ async def test_register_short_password(client: AsyncClient):
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
-async def test_login_success(client: AsyncClient, test_db):
+async def test_login_success(client: AsyncClient):
     """Test successful login"""
     # Ensure user exists
-    await test_db["users"].delete_one({"email": "logintest@example.com"})
     await client.post(
         "/api/v1/auth/register",
         json={
@@ -114,7 +104,6 @@ async def test_login_success(client: AsyncClient, test_db):
     assert data["user"]["email"] == "logintest@example.com"
 
 
-@pytest.mark.asyncio
 async def test_login_invalid_credentials(client: AsyncClient):
     """Test login with invalid credentials"""
     response = await client.post(
@@ -128,11 +117,9 @@ async def test_login_invalid_credentials(client: AsyncClient):
     assert response.status_code == 401
 
 
-@pytest.mark.asyncio
-async def test_refresh_token(client: AsyncClient, test_db):
+async def test_refresh_token(client: AsyncClient):
     """Test token refresh"""
     # Get tokens first
-    await test_db["users"].delete_one({"email": "refresh@example.com"})
     register_response = await client.post(
         "/api/v1/auth/register",
         json={
@@ -156,7 +143,6 @@ async def test_refresh_token(client: AsyncClient, test_db):
     assert "refresh_token" in data
 
 
-@pytest.mark.asyncio
 async def test_refresh_invalid_token(client: AsyncClient):
     """Test refresh with invalid token"""
     response = await client.post(
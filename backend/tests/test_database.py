@@ -0,0 +1,43 @@
+"""Tests for database indexes backing hot queries"""
+from datetime import datetime
+
+
+def _stages(plan: dict) -> set:
+    """Collect every stage name in an explain plan tree"""
+    stages = {plan.get("stage")}
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= _stages(child)
+    return stages
+
+
+async def _winning_stages(test_db, command: dict) -> set:
+    """Explain a command and return the stages of its winning plan"""
+    explain = await test_db.command("explain", command, verbosity="executionStats")
+    return _stages(explain["queryPlanner"]["winningPlan"])
+
+
+async def test_hot_queries_use_indexes(test_db):
+    """Test that subscription, settings and message lookups avoid collection scans"""
+    subscription_stages = await _winning_stages(
+        test_db, {"find": "subscriptions", "filter": {"user_id": "index-test"}}
+    )
+    assert "IXSCAN" in subscription_stages
+    assert "COLLSCAN" not in subscription_stages
+
+    settings_stages = await _winning_stages(
+        test_db, {"find": "settings", "filter": {"user_id": "index-test"}}
+    )
+    assert "IXSCAN" in settings_stages
+
+    count_stages = await _winning_stages(
+        test_db,
+        {
+            "count": "messages",
+            "query": {"user_id": "index-test", "created_at": {"$gte": datetime(2024, 1, 1)}},
+        },
+    )
+    assert "COUNT_SCAN" in count_stages or "IXSCAN" in count_stages
+    assert "COLLSCAN" not in count_stages
@@ -1,9 +1,7 @@
 """Tests for message analysis endpoints"""
-import pytest
 from httpx import AsyncClient
 
 
-@pytest.mark.asyncio
 async def test_analyze_message_spam(authenticated_client: AsyncClient):
     """Test analyzing a spam message"""
     response = await authenticated_client.post(
@@ -24,7 +22,6 @@ async def test_analyze_message_spam(authenticated_client: AsyncClient):
     assert data["analysis"]["category"] in ["lottery", "scam", "phishing"]
 
 
-@pytest.mark.asyncio
 async def test_analyze_message_safe(authenticated_client: AsyncClient):
     """Test analyzing a safe message"""
     response = await authenticated_client.post(
@@ -42,7 +39,6 @@ async def test_analyze_message_safe(authenticated_client: AsyncClient):
     assert data["analysis"]["category"] == "safe"
 
 
-@pytest.mark.asyncio
 async def test_analyze_turkish_betting_spam(authenticated_client: AsyncClient):
     """Test analyzing Turkish betting spam"""
     response = await authenticated_client.post(
@@ -61,7 +57,6 @@ async def test_analyze_turkish_betting_spam(authenticated_client: AsyncClient):
     assert data["analysis"]["confidence"] >= 0.9
 
 
-@pytest.mark.asyncio
 async def test_analyze_phishing_message(authenticated_client: AsyncClient):
     """Test analyzing phishing message"""
     response = await authenticated_client.post(
@@ -79,7 +74,6 @@ async def test_analyze_phishing_message(authenticated_client: AsyncClient):
     assert data["analysis"]["risk_level"] in ["high", "critical"]
 
 
-@pytest.mark.asyncio
 async def test_analyze_empty_message(authenticated_client: AsyncClient):
     """Test analyzing empty message"""
     response = await authenticated_client.post(
@@ -93,7 +87,6 @@ async def test_analyze_empty_message(authenticated_client: AsyncClient):
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
 async def test_get_message_history(authenticated_client: AsyncClient):
     """Test getting message history"""
     # First, analyze a message
@@ -114,7 +107,6 @@ async def test_get_message_history(authenticated_client: AsyncClient):
     assert len(data) > 0
 
 
-@pytest.mark.asyncio
 async def test_get_message_stats(authenticated_client: AsyncClient):
     """Test getting message statistics"""
     response = await authenticated_client.get("/api/v1/messages/stats")
@@ -127,7 +119,6 @@ async def test_get_message_stats(authenticated_client: AsyncClient):
     assert "spam_by_category" in data
 
 
-@pytest.mark.asyncio
 async def test_provide_feedback(authenticated_client: AsyncClient):
     """Test providing feedback on analysis"""
     # First, analyze a message
@@ -150,7 +141,6 @@ async def test_provide_feedback(authenticated_client: AsyncClient):
     assert response.status_code == 200
 
 
-@pytest.mark.asyncio
 async def test_delete_message(authenticated_client: AsyncClient):
     """Test deleting a message"""
     # First, analyze a message
@@ -170,7 +160,6 @@ async def test_delete_message(authenticated_client: AsyncClient):
     assert response.status_code == 200
 
 
-@pytest.mark.asyncio
 async def test_bulk_analysis(authenticated_client: AsyncClient):
     """Test bulk message analysis"""
     response = await authenticated_client.post(
@@ -191,7 +180,36 @@ async def test_bulk_analysis(authenticated_client: AsyncClient):
     assert len(data["results"]) == 3
 
 
-@pytest.mark.asyncio
+async def test_usage_counts_analyzed_messages(authenticated_client: AsyncClient):
+    """Test daily usage grows by one per analyzed message and ignores deletes"""
+    async def used() -> int:
+        response = await authenticated_client.get("/api/v1/subscription/usage")
+        assert response.status_code == 200
+        return response.json()["used"]
+
+    before = await used()
+
+    response = await authenticated_client.post(
+        "/api/v1/messages/analyze",
+        json={"content": "Usage single message", "source": "manual"},
+    )
+    assert response.status_code == 201
+    message_id = response.json()["id"]
+    assert await used() == before + 1
+
+    bulk = [{"content": f"Usage bulk message {i}", "source": "manual"} for i in range(4)]
+    response = await authenticated_client.post(
+        "/api/v1/messages/analyze/bulk", json={"messages": bulk}
+    )
+    assert response.status_code == 200
+    assert await used() == before + 1 + len(bulk)
+
+    # Deleting history does not give back analyses already spent
+    response = await authenticated_client.delete(f"/api/v1/messages/{message_id}")
+    assert response.status_code == 200
+    assert await used() == before + 1 + len(bulk)
+
+
 async def test_unauthorized_access(client: AsyncClient):
     """Test accessing protected endpoint without auth"""
     response = await client.post(
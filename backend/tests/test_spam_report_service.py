@@ -0,0 +1,78 @@
+"""Tests for community spam scoring"""
+from datetime import timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.clock import utc_now
+from app.services.spam_report_service import SpamReportService, compute_spam_scores
+
+
+@pytest.mark.parametrize(
+    "total_reports, days_idle, expected",
+    [
+        (0, 0, 0),  # No reports
+        (3, 0, 30),  # 10 points per report
+        (15, 0, 100),  # Capped at 100
+        (3, 14, 28),  # 1 point per full idle week
+        (15, 200, 80),  # Decay capped at 20 points
+        (1, 200, 0),  # Never below 0
+        (3, -10, 30),  # last_reported in the future: no decay
+    ],
+)
+def test_compute_spam_scores(total_reports, days_idle, expected):
+    """Test score, decay and clamping edges"""
+    scores = compute_spam_scores(np.array([total_reports]), np.array([days_idle]))
+
+    assert scores.tolist() == [expected]
+
+
+class FakeCursor:
+    """Cursor returning all documents in a single batch"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length):
+        docs, self.docs = self.docs, []
+        return docs
+
+
+class FakeCommunitySpam:
+    """community_spam collection recording bulk writes"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.operations = []
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.docs)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+        return SimpleNamespace(modified_count=len(operations))
+
+
+async def test_rescore_writes_only_changed_scores():
+    """Test rescoring skips records whose score is already current"""
+    now = utc_now()
+    community_spam = FakeCommunitySpam([
+        {"_id": 1, "total_reports": 3, "spam_score": 30, "last_reported": now},
+        {"_id": 2, "total_reports": 3, "spam_score": 30, "last_reported": now - timedelta(days=21)},
+        {"_id": 3, "total_reports": 5, "spam_score": 10, "last_reported": None},
+    ])
+    service = SpamReportService(
+        SimpleNamespace(spam_reports=None, community_spam=community_spam)
+    )
+
+    updated = await service.rescore_community_spam()
+
+    assert updated == 2
+    assert [(op._filter, op._doc) for op in community_spam.operations] == [
+        ({"_id": 2}, {"$set": {"spam_score": 27}}),
+        ({"_id": 3}, {"$set": {"spam_score": 50}}),
+    ]
@@ -0,0 +1,33 @@
+"""Tests for subscription tier caching"""
+from bson import ObjectId
+
+from app.services.payment_service import PaymentService
+from app.services.subscription_service import SubscriptionService, _subscription_cache
+
+
+async def test_subscription_cache_invalidated_on_change(test_db):
+    """Test upgrades and cancellations drop the cached tier"""
+    user_oid = ObjectId()
+    user_id = str(user_oid)
+    await test_db.users.insert_one(
+        {"_id": user_oid, "email": "subscription-cache@example.com", "tier": "free"}
+    )
+    service = SubscriptionService(test_db)
+
+    try:
+        assert not await service.is_premium_user(user_id)
+        assert user_id in _subscription_cache
+
+        await PaymentService()._upgrade_user_subscription(
+            {"user_id": user_id, "metadata": {"tier": "premium", "billing_cycle": "monthly"}}
+        )
+        assert user_id not in _subscription_cache
+        assert await service.is_premium_user(user_id)
+
+        assert await service.cancel_subscription(user_id)
+        assert user_id not in _subscription_cache
+        # Cancelled subscriptions stay premium until the end of the period
+        assert await service.is_premium_user(user_id)
+    finally:
+        await test_db.users.delete_one({"_id": user_oid})
+        await test_db.subscriptions.delete_one({"user_id": user_id})
@@ -1,9 +1,9 @@
 """Tests for user endpoints"""
+import asyncio
 import pytest
 from httpx import AsyncClient
 
 
-@pytest.mark.asyncio
 async def test_get_profile(authenticated_client: AsyncClient):
     """Test getting user profile"""
     response = await authenticated_client.get("/api/v1/users/me")
@@ -16,37 +16,20 @@ async def test_get_profile(authenticated_client: AsyncClient):
     assert "created_at" in data
 
 
-@pytest.mark.asyncio
-async def test_update_profile(authenticated_client: AsyncClient):
-    """Test updating user profile"""
-    response = await authenticated_client.patch(
-        "/api/v1/users/me",
-        json={
-            "full_name": "Updated Name",
-            "phone": "+905551234567",
-        },
-    )
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["full_name"] == "Updated Name"
-    assert data["phone"] == "+905551234567"
-
-
-@pytest.mark.asyncio
-async def test_update_language(authenticated_client: AsyncClient):
-    """Test updating language preference"""
-    response = await authenticated_client.patch(
-        "/api/v1/users/me",
-        json={"language": "tr"},
-    )
+@pytest.mark.parametrize(
+    "payload",
+    [{"full_name": "Updated Name", "phone": "+905551234567", "language": "tr"}],
+)
+async def test_update_profile(authenticated_client: AsyncClient, payload: dict):
+    """Test updating profile fields and language preference in one request"""
+    response = await authenticated_client.patch("/api/v1/users/me", json=payload)
 
     assert response.status_code == 200
     data = response.json()
-    assert data["language"] == "tr"
+    for field, value in payload.items():
+        assert data[field] == value
 
 
-@pytest.mark.asyncio
 async def test_get_settings(authenticated_client: AsyncClient):
     """Test getting user settings"""
     response = await authenticated_client.get("/api/v1/users/me/settings")
@@ -60,7 +43,33 @@ async def test_get_settings(authenticated_client: AsyncClient):
     assert "blacklist" in data
 
 
-@pytest.mark.asyncio
+async def test_get_settings_page(authenticated_client: AsyncClient):
+    """Test paginating the whitelist while totals count every entry"""
+    response = await authenticated_client.get("/api/v1/users/me/settings")
+    existing = response.json()["whitelist_total"]
+
+    values = [f"page_test_{i}" for i in range(4)]
+    for value in values:
+        response = await authenticated_client.post(
+            "/api/v1/users/me/whitelist",
+            json={"value": value, "type": "keyword"},
+        )
+        assert response.status_code == 200
+
+    full = (await authenticated_client.get("/api/v1/users/me/settings")).json()
+    response = await authenticated_client.get(
+        "/api/v1/users/me/settings",
+        params={"whitelist_skip": existing + 1, "whitelist_limit": 2},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [e["value"] for e in data["whitelist"]] == values[1:3]
+    assert data["whitelist_total"] == existing + len(values)
+    assert data["blacklist"] == full["blacklist"]
+    assert data["blacklist_total"] == len(full["blacklist"])
+
+
 async def test_update_settings(authenticated_client: AsyncClient):
     """Test updating user settings"""
     response = await authenticated_client.patch(
@@ -79,7 +88,6 @@ async def test_update_settings(authenticated_client: AsyncClient):
     assert data["notifications_enabled"] == False
 
 
-@pytest.mark.asyncio
 async def test_add_to_whitelist(authenticated_client: AsyncClient):
     """Test adding to whitelist"""
     response = await authenticated_client.post(
@@ -94,22 +102,42 @@ async def test_add_to_whitelist(authenticated_client: AsyncClient):
     assert response.status_code == 200
 
 
-@pytest.mark.asyncio
-async def test_add_to_blacklist(authenticated_client: AsyncClient):
+@pytest.mark.parametrize(
+    "value, entry_type, expected_status",
+    [
+        ("+901234567890", "phone", 200),
+        ("+9012*", "phone_prefix", 200),
+        ("+90*12", "phone_prefix", 422),
+        ("+٩٠١٢*", "phone_prefix", 422),  # Non-ASCII digits
+    ],
+)
+async def test_add_to_blacklist(
+    authenticated_client: AsyncClient, value, entry_type, expected_status
+):
     """Test adding to blacklist"""
     response = await authenticated_client.post(
         "/api/v1/users/me/blacklist",
         json={
-            "value": "+901234567890",
-            "type": "phone",
+            "value": value,
+            "type": entry_type,
             "reason": "Spam sender",
         },
     )
 
+    assert response.status_code == expected_status
+
+
+async def test_add_duplicate_to_blacklist(authenticated_client: AsyncClient):
+    """Test adding the same value to blacklist twice"""
+    entry = {"value": "duplicate_test", "type": "keyword"}
+    response = await authenticated_client.post("/api/v1/users/me/blacklist", json=entry)
     assert response.status_code == 200
 
+    response = await authenticated_client.post("/api/v1/users/me/blacklist", json=entry)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Already in blacklist"
+
 
-@pytest.mark.asyncio
 async def test_remove_from_whitelist(authenticated_client: AsyncClient):
     """Test removing from whitelist"""
     # First add
@@ -126,14 +154,37 @@ async def test_remove_from_whitelist(authenticated_client: AsyncClient):
     assert response.status_code == 200
 
 
-@pytest.mark.asyncio
-async def test_change_password(authenticated_client: AsyncClient, test_db):
-    """Test password change"""
-    # First create a fresh user for this test
-    await test_db["users"].delete_one({"email": "pwchange@example.com"})
+async def test_whitelist_blacklist_concurrent(authenticated_client: AsyncClient):
+    """Test concurrent whitelist and blacklist writes on the same settings document"""
+    add_white, add_black = await asyncio.gather(
+        authenticated_client.post(
+            "/api/v1/users/me/whitelist",
+            json={"value": "concurrent_white", "type": "keyword"},
+        ),
+        authenticated_client.post(
+            "/api/v1/users/me/blacklist",
+            json={"value": "concurrent_black", "type": "keyword"},
+        ),
+    )
+
+    assert add_white.status_code == 200
+    assert add_black.status_code == 200
+
+    settings = (await authenticated_client.get("/api/v1/users/me/settings")).json()
+    assert "concurrent_white" in [e["value"] for e in settings["whitelist"]]
+    assert "concurrent_black" in [e["value"] for e in settings["blacklist"]]
 
+    response = await authenticated_client.delete(
+        "/api/v1/users/me/whitelist/concurrent_white"
+    )
+
+    assert response.status_code == 200
+
+
+async def test_change_password(client: AsyncClient):
+    """Test password change"""
     # Register new user
-    register_response = await authenticated_client.post(
+    register_response = await client.post(
         "/api/v1/auth/register",
         json={
             "email": "pwchange@example.com",
@@ -144,10 +195,10 @@ async def test_change_password(authenticated_client: AsyncClient, test_db):
 
     # Get new token for this user
     token = register_response.json()["access_token"]
-    authenticated_client.headers["Authorization"] = f"Bearer {token}"
+    client.headers["Authorization"] = f"Bearer {token}"
 
     # Change password
-    response = await authenticated_client.post(
+    response = await client.post(
         "/api/v1/users/me/change-password",
         json={
             "current_password": "oldpassword123",
@@ -158,7 +209,6 @@ async def test_change_password(authenticated_client: AsyncClient, test_db):
     assert response.status_code == 200
 
 
-@pytest.mark.asyncio
 async def test_change_password_wrong_current(authenticated_client: AsyncClient):
     """Test password change with wrong current password"""
     response = await authenticated_client.post(